@@ -1,60 +1,174 @@
 # 3‑D video example: https://www.splats.tv/watch/514
 # Tested with spatialstudio 1.1.0.41
-# pip install spatialstudio librosa noise tqdm
+# pip install spatialstudio librosa noise tqdm  (+ numba, optional: JIT height field)
 from spatialstudio import splv
 import numpy as np
 import librosa
 import math
-import copy
 import multiprocessing as mp
-import hashlib
+from multiprocessing.pool import ThreadPool
+from collections import deque
+from functools import lru_cache
 from tqdm import tqdm
 from noise import pnoise2
 
 # ────────────────────────── Utility ────────────────────────── #
 
+SUN_COLORS     = ((255,94,0),(255,42,100),(180,0,255))
+TERRAIN_COLORS = ((25,214,252),(255,20,147),(232,103,23),(232,224,16))
+
 def interpolate_color(colors, t):
-    t %= 1.0
+    """Cyclic palette lerp; t may be a scalar or an array → (..., 3) uint8."""
+    colors   = np.asarray(colors, dtype=float)
+    t        = np.asarray(t, dtype=float) % 1.0
     n        = len(colors)
     t_scaled = t * n
-    idx      = int(t_scaled) % n
-    t_local  = t_scaled - idx
-    c1, c2   = colors[idx], colors[(idx + 1) % n]
-    r = int((1 - t_local) * c1[0] + t_local * c2[0])
-    g = int((1 - t_local) * c1[1] + t_local * c2[1])
-    b = int((1 - t_local) * c1[2] + t_local * c2[2])
-    return r, g, b
+    idx      = t_scaled.astype(int) % n
+    t_local  = (t_scaled - idx)[..., None]
+    rgb      = (1 - t_local) * colors[idx] + t_local * colors[(idx + 1) % n]
+    return rgb.astype(np.uint8)
+
+@lru_cache(maxsize=None)
+def color_lut(colors, size):
+    """interpolate_color sampled at i/size – exact for integer rows 0..size‑1."""
+    return interpolate_color(colors, np.arange(size) / size)
+
+def hash_u8(x, z, seed):
+    """Deterministic 0‑255 hash per (x, z) lattice point (splitmix64 finaliser)."""
+    h  = np.asarray(x, dtype=np.int64).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    h ^= np.asarray(z, dtype=np.int64).astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+    h ^= np.uint64(seed) * np.uint64(0x165667B19E3779F9)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xC4CEB9FE1A85EC53)
+    h ^= h >> np.uint64(33)
+    return (h >> np.uint64(56)).astype(np.uint8)
+
+# ───────────────────── Perlin height field ───────────────────── #
+# Optional numba path: every octave of a lattice window is evaluated in one
+# compiled pass instead of a Python pnoise2 call per sample.
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Ken Perlin's permutation (same table the noise package uses), repeated so
+# nested lookups plus the per‑octave base offset never run off the end
+PERM = np.array([
+    151,160,137, 91, 90, 15,131, 13,201, 95, 96, 53,194,233,  7,225,
+    140, 36,103, 30, 69,142,  8, 99, 37,240, 21, 10, 23,190,  6,148,
+    247,120,234, 75,  0, 26,197, 62, 94,252,219,203,117, 35, 11, 32,
+     57,177, 33, 88,237,149, 56, 87,174, 20,125,136,171,168, 68,175,
+     74,165, 71,134,139, 48, 27,166, 77,146,158,231, 83,111,229,122,
+     60,211,133,230,220,105, 92, 41, 55, 46,245, 40,244,102,143, 54,
+     65, 25, 63,161,  1,216, 80, 73,209, 76,132,187,208, 89, 18,169,
+    200,196,135,130,116,188,159, 86,164,100,109,198,173,186,  3, 64,
+     52,217,226,250,124,123,  5,202, 38,147,118,126,255, 82, 85,212,
+    207,206, 59,227, 47, 16, 58, 17,182,189, 28, 42,223,183,170,213,
+    119,248,152,  2, 44,154,163, 70,221,153,101,155,167, 43,172,  9,
+    129, 22, 39,253, 19, 98,108,110, 79,113,224,232,178,185,112,104,
+    218,246, 97,228,251, 34,242,193,238,210,144, 12,191,179,162,241,
+     81, 51,145,235,249, 14,239,107, 49,192,214, 31,181,199,106,157,
+    184, 84,204,176,115,121, 50, 45,127,  4,150,254,138,236,205, 93,
+    222,114, 67, 29, 24, 72,243,141,128,195, 78, 66,215, 61,156,180] * 3, dtype=np.int64)
+GRAD2 = np.array([( 1, 1),(-1, 1),( 1,-1),(-1,-1),( 1, 0),(-1, 0),( 1, 0),(-1, 0),
+                  ( 0, 1),( 0,-1),( 0, 1),( 0,-1),( 1, 0),(-1, 0),( 0,-1),( 0, 1)], dtype=float)
+
+if HAVE_NUMBA:
+    @njit(fastmath=True)
+    def _pnoise2(x, y, base):
+        """Single‑octave 2‑D Perlin noise matching noise.pnoise2(x, y, base=base)."""
+        fi, fj = math.floor(x), math.floor(y)
+        i, j   = int(fi) & 255, int(fj) & 255
+        x, y   = x - fi, y - fj
+        fx     = x*x*x * (x * (x*6 - 15) + 10)
+        fy     = y*y*y * (y * (y*6 - 15) + 10)
+
+        A, B   = PERM[i + base], PERM[((i + 1) & 255) + base]
+        j0, j1 = j + base, ((j + 1) & 255) + base
+        g00, g10 = PERM[PERM[A + j0]] & 15, PERM[PERM[B + j0]] & 15
+        g01, g11 = PERM[PERM[A + j1]] & 15, PERM[PERM[B + j1]] & 15
+
+        n00 = x*GRAD2[g00, 0]     + y*GRAD2[g00, 1]
+        n10 = (x-1)*GRAD2[g10, 0] + y*GRAD2[g10, 1]
+        n01 = x*GRAD2[g01, 0]     + (y-1)*GRAD2[g01, 1]
+        n11 = (x-1)*GRAD2[g11, 0] + (y-1)*GRAD2[g11, 1]
+        n0  = n00 + fx*(n10 - n00)
+        n1  = n01 + fx*(n11 - n01)
+        return n0 + fy*(n1 - n0)
+
+    @njit(nogil=True, fastmath=True)
+    def _octave_fields(xs, zs, w, d, noise_s, octaves):
+        """|pnoise2| of every octave on the xs × zs lattice → (octaves, nx, nz)."""
+        O = np.empty((octaves, len(xs), len(zs)))
+        for a in range(len(xs)):
+            for b in range(len(zs)):
+                for i in range(octaves):
+                    scale = noise_s**(i+1)
+                    # pnoise2 samples in float32
+                    O[i, a, b] = abs(_pnoise2(np.float32(xs[a]/w*scale),
+                                              np.float32(zs[b]/d*scale), i))
+        return O
+
+def octave_fields(xs, zs, w, d, noise_s, octaves):
+    if HAVE_NUMBA:
+        return _octave_fields(xs.astype(float), zs.astype(float), w, d, noise_s, octaves)
+    xn, zn = np.meshgrid(xs/w, zs/d, indexing='ij')
+    return np.stack([np.abs(np.vectorize(pnoise2)(xn*noise_s**(i+1), zn*noise_s**(i+1), base=i))
+                     for i in range(octaves)])
 
 def sdf_triangle(p, a, b, c):
-    ba, pa = b - a, p - a
-    cb, pb = c - b, p - b
-    ac, pc = a - c, p - c
-    nor    = np.cross(ba, ac)
-
-    def dot2(v): return np.sum(v * v, axis=-1)
-
-    sign   = (np.sign(np.sum(np.cross(ba, nor)[None] * pa, 1)) +
-              np.sign(np.sum(np.cross(cb, nor)[None] * pb, 1)) +
-              np.sign(np.sum(np.cross(ac, nor)[None] * pc, 1)))
-    outside     = sign < 2
-    ba_proj     = np.clip(np.dot(pa, ba) / np.sum(ba*ba), 0.0, 1.0)
-    cb_proj     = np.clip(np.dot(pb, cb) / np.sum(cb*cb), 0.0, 1.0)
-    ac_proj     = np.clip(np.dot(pc, ac) / np.sum(ac*ac), 0.0, 1.0)
-    d0          = dot2(ba[None] * ba_proj[:, None] - pa)
-    d1          = dot2(cb[None] * cb_proj[:, None] - pb)
-    d2          = dot2(ac[None] * ac_proj[:, None] - pc)
-    dist_edge   = np.minimum(np.minimum(d0, d1), d2)
-    d_face      = (np.dot(pa, nor) ** 2) / np.sum(nor*nor)
-    return np.sqrt(np.where(outside, dist_edge, d_face))
-
-def rasterize_triangle(density, a, b, c, spacing, z_off):
-    min_c = np.floor(np.min([a, b, c], 0)).astype(int)
-    max_c = np.ceil (np.max([a, b, c], 0)).astype(int)
-    xs, ys, zs = [np.arange(lo, hi + 1) for lo, hi in zip(min_c, max_c)]
-    grid   = np.stack(np.meshgrid(xs + .5, ys + .5, zs + .5, indexing='ij'), -1)
-    points = grid.reshape(-1, 3)
-    mask   = sdf_triangle(points, a, b, c) < .5
-    voxels = points[mask] - .5
+    # a, b, c broadcast against p, e.g. (K, 1, 3) vertices for (K, M, 3) points.
+    # Edge vectors/normals only touch the small vertex arrays; the points are
+    # streamed as x/y/z planes so no (..., 3) point‑sized temporaries are made.
+    def dot(u, v): return u[..., 0]*v[..., 0] + u[..., 1]*v[..., 1] + u[..., 2]*v[..., 2]
+
+    nor  = np.cross(b - a, a - c)
+    px, py, pz = p[..., 0], p[..., 1], p[..., 2]
+    sign, dist_edge = 0, np.inf
+    for i, (o, e) in enumerate(((a, b - a), (b, c - b), (c, a - c))):
+        rx, ry, rz = px - o[..., 0], py - o[..., 1], pz - o[..., 2]
+        s      = np.cross(e, nor)
+        sign   = sign + np.sign(rx*s[..., 0] + ry*s[..., 1] + rz*s[..., 2])
+        t      = np.clip((rx*e[..., 0] + ry*e[..., 1] + rz*e[..., 2]) / dot(e, e), 0.0, 1.0)
+        dx, dy, dz = e[..., 0]*t - rx, e[..., 1]*t - ry, e[..., 2]*t - rz
+        dist_edge  = np.minimum(dist_edge, dx*dx + dy*dy + dz*dz)
+        if i == 0:  # face distance is measured from a
+            d_face = (rx*nor[..., 0] + ry*nor[..., 1] + rz*nor[..., 2]) ** 2 / dot(nor, nor)
+    return np.sqrt(np.where(sign < 2, dist_edge, d_face))
+
+def rasterize_triangles(density, tris, z_off):
+    """Voxelise a batch of triangles (N, 3, 3) with one SDF pass per AABB shape.
+
+    Triangles whose integer bounding boxes share the same extent are stacked
+    into a (K, M, 3) point block, so the SDF broadcasts over K triangles at
+    once instead of being called per triangle. With numba the compiled scalar
+    kernel does the same walk and dedupes through an occupancy grid.
+    """
+    if HAVE_NUMBA:
+        occ = np.zeros(density, bool)
+        _rasterize_kernel(tris, occ, z_off)
+        return np.argwhere(occ)
+
+    lo  = np.floor(tris.min(1)).astype(int)
+    ext = np.ceil(tris.max(1)).astype(int) - lo + 1
+    shapes, group = np.unique(ext, axis=0, return_inverse=True)
+    group = group.reshape(-1)
+
+    out = []
+    for g, (ex, ey, ez) in enumerate(shapes):
+        k      = np.flatnonzero(group == g)
+        offs   = np.stack(np.meshgrid(np.arange(ex), np.arange(ey), np.arange(ez),
+                                      indexing='ij'), -1).reshape(-1, 3)
+        points = lo[k, None] + offs[None] + .5
+        t      = tris[k, :, None]
+        mask   = sdf_triangle(points, t[:, 0], t[:, 1], t[:, 2]) < .5
+        out.append(points[mask] - .5)
+
+    voxels = np.concatenate(out)
     voxels[:, 2] -= z_off
     voxels        = np.round(voxels).astype(int)
 
@@ -63,25 +177,117 @@ def rasterize_triangle(density, a, b, c, spacing, z_off):
     in_bounds = ((0 <= x) & (x < w) &
                  (0 <= y) & (y < h) &
                  (0 <= z) & (z < d))
-    return voxels[in_bounds]
+
+    # neighbouring triangles share edge voxels: dedupe on the linear index
+    idx = np.unique(np.ravel_multi_index(voxels[in_bounds].T, density))
+    return np.stack(np.unravel_index(idx, density), -1)
+
+if HAVE_NUMBA:
+    @njit(nogil=True, error_model='numpy')
+    def _rasterize_kernel(tris, occ, z_off):
+        """Compiled rasterize_triangles: walk each triangle's integer AABB and
+        mark every in‑bounds voxel whose centre lies within .5 of it in occ."""
+        w, h, d = occ.shape
+        e, s    = np.empty((3, 3)), np.empty((3, 3))
+        ee      = np.empty(3)
+        nor     = np.empty(3)
+        lo, hi  = np.empty(3, np.int64), np.empty(3, np.int64)
+        dist    = np.empty(64)
+        for k in range(len(tris)):
+            t = tris[k]
+            for i in range(3):
+                for c in range(3):
+                    e[i, c] = t[(i+1) % 3, c] - t[i, c]
+            # nor = (b - a) × (a - c); s_i = e_i × nor, as in sdf_triangle
+            nor[0] = e[0, 1]*e[2, 2] - e[0, 2]*e[2, 1]
+            nor[1] = e[0, 2]*e[2, 0] - e[0, 0]*e[2, 2]
+            nor[2] = e[0, 0]*e[2, 1] - e[0, 1]*e[2, 0]
+            nn     = nor[0]*nor[0] + nor[1]*nor[1] + nor[2]*nor[2]
+            for i in range(3):
+                s[i, 0] = e[i, 1]*nor[2] - e[i, 2]*nor[1]
+                s[i, 1] = e[i, 2]*nor[0] - e[i, 0]*nor[2]
+                s[i, 2] = e[i, 0]*nor[1] - e[i, 1]*nor[0]
+                ee[i]   = e[i, 0]*e[i, 0] + e[i, 1]*e[i, 1] + e[i, 2]*e[i, 2]
+
+            for c in range(3):
+                lo[c] = math.floor(min(t[0, c], t[1, c], t[2, c]))
+                hi[c] = math.ceil(max(t[0, c], t[1, c], t[2, c]))
+            # per‑edge constants as scalars (tuples) so the z loop below only
+            # touches registers and LLVM can vectorise it
+            tz  = (t[0, 2], t[1, 2], t[2, 2])
+            ex  = (e[0, 0], e[1, 0], e[2, 0])
+            ey  = (e[0, 1], e[1, 1], e[2, 1])
+            ez  = (e[0, 2], e[1, 2], e[2, 2])
+            sz  = (s[0, 2], s[1, 2], s[2, 2])
+            eei = (ee[0], ee[1], ee[2])
+            nor_z = nor[2]
+            nzr = hi[2] - lo[2] + 1
+            if nzr > len(dist):
+                dist = np.empty(nzr)
+            for x in range(max(lo[0], 0), min(hi[0] + 1, w)):
+                for y in range(max(lo[1], 0), min(hi[1] + 1, h)):
+                    # x/y halves of every dot product are fixed for this
+                    # column; only the rz terms vary along z
+                    rx = (x + .5 - t[0, 0], x + .5 - t[1, 0], x + .5 - t[2, 0])
+                    ry = (y + .5 - t[0, 1], y + .5 - t[1, 1], y + .5 - t[2, 1])
+                    ps = (rx[0]*s[0, 0] + ry[0]*s[0, 1], rx[1]*s[1, 0] + ry[1]*s[1, 1],
+                          rx[2]*s[2, 0] + ry[2]*s[2, 1])
+                    pe = (rx[0]*e[0, 0] + ry[0]*e[0, 1], rx[1]*e[1, 0] + ry[1]*e[1, 1],
+                          rx[2]*e[2, 0] + ry[2]*e[2, 1])
+                    pn = rx[0]*nor[0] + ry[0]*nor[1]
+
+                    # branch‑free SDF over the z run, then a scalar pass to
+                    # scatter the hits
+                    for j in range(nzr):
+                        zc = lo[2] + j + .5
+                        sign, dist_edge = 0, np.inf
+                        for i in range(3):
+                            rz = zc - tz[i]
+                            side  = ps[i] + rz*sz[i]
+                            sign += (side > 0) - (side < 0)
+                            u  = (pe[i] + rz*ez[i]) / eei[i]
+                            u  = 0.0 if u < 0.0 else 1.0 if u > 1.0 else u
+                            dx, dy, dz = ex[i]*u - rx[i], ey[i]*u - ry[i], ez[i]*u - rz
+                            q  = dx*dx + dy*dy + dz*dz
+                            dist_edge = q if q < dist_edge else dist_edge
+                        d_face  = (pn + (zc - tz[0])*nor_z) ** 2 / nn
+                        dist[j] = math.sqrt(dist_edge if sign < 2 else d_face)
+                    for j in range(nzr):
+                        if dist[j] < .5:
+                            z = int(np.rint(lo[2] + j - z_off))
+                            if 0 <= z < d:
+                                occ[x, y, z] = True
 
 # ────────────────────────── Audio ────────────────────────── #
 
 class AudioProcessor:
-    def __init__(self, path, bands, sr=44_100, hop=512, thresh=0.5):
+    def __init__(self, path, bands, sr=44_100, hop=512, thresh=0.5,
+                 n_fft=2048, chunk=4096):
         self.sr, self.hop = sr, hop
         self.raw, _       = librosa.load(path, sr=sr)
         self.frames       = 1 + len(self.raw)//hop
-        mag               = np.abs(librosa.stft(self.raw, hop_length=hop))
-        basis             = librosa.filters.mel(sr=sr, n_fft=mag.shape[0]*2-2,
+        basis             = librosa.filters.mel(sr=sr, n_fft=n_fft,
                                                n_mels=bands, fmin=50.0, fmax=20_000.0)
-        db                = librosa.power_to_db(basis @ mag, ref=np.max)
-        self.spec         = (db - db.min()) / (db.max()-db.min())
+        # Stream the STFT `chunk` frames at a time (same centred framing as
+        # librosa.stft) so only one block of magnitudes is ever alive; the
+        # mel projection is tiny and kept whole for the global dB reference.
+        padded            = np.pad(self.raw, n_fft//2)
+        mel               = np.empty((bands, self.frames), np.float32)
+        for f0 in range(0, self.frames, chunk):
+            f1  = min(f0 + chunk, self.frames)
+            seg = padded[f0*hop:(f1-1)*hop + n_fft]
+            mel[:, f0:f1] = basis @ np.abs(librosa.stft(seg, n_fft=n_fft, hop_length=hop,
+                                                        center=False))
+        db                = librosa.power_to_db(mel, ref=np.max)
+        # 8‑bit levels are plenty for a visualiser; band_frame is then just a
+        # lookup into the thresholded response of all 256 levels
+        self.spec         = np.round((db - db.min()) / (db.max()-db.min()) * 255).astype(np.uint8)
         self.thresh       = thresh
+        level             = np.arange(256) / 255
+        self.band_lut     = np.where(level > thresh, (level - thresh) / (1 - thresh), 0)
 
     def band_frame(self, idx):
-        f = self.spec[:, idx]
-        return np.where(f > self.thresh, (f - self.thresh) / (1 - self.thresh), 0)
+        return self.band_lut[self.spec[:, idx]]
 
     def pcm_frame(self, start, n):
         buf = np.clip(self.raw[start:start+n], -1, 1)
@@ -98,25 +304,26 @@ class Visualizer:
         self.weights = np.zeros(octaves)
         self.scroll  = scroll
         self.decay   = decay
+        self.fields  = {}  # dims → cached octave noise window, shared by copies
 
-    # 3‑D "vaporwave" sun (flattened disc to save voxels)
+    # 3‑D "vaporwave" sun (flattened disc to save voxels), kept as its set
+    # voxels (M, 3) and their RGBA (M, 4) so present() can blit it directly
     def create_sun(self, n):
-        sun = splv.Frame(n, n, n)
         max_strip, min_strip = n//16, n//32
         flatten_factor = 0.4  # Make it more disc-like
-        for x in range(n):
-            for y in range(n):
-                for z in range(n):
-                    dx, dy, dz = x + .5 - n/2, y + .5 - n/2, z + .5 - n/2
-                    # Flatten the sun by scaling the z dimension
-                    distance = math.sqrt(dx*dx + dy*dy + (dz*flatten_factor)*(dz*flatten_factor))
-                    if distance <= n/2:
-                        y_norm = y / n
-                        stripes = int(min_strip + y_norm*(max_strip-min_strip))
-                        if (y // stripes) % 2 == 0:
-                            sun.set_voxel(x, y, z,
-                                interpolate_color([(255,94,0),(255,42,100),(180,0,255)], y_norm))
-        return sun
+        dx, dy, dz = np.indices((n, n, n)) + .5 - n/2
+        # Flatten the sun by scaling the z dimension
+        distance = np.sqrt(dx*dx + dy*dy + (dz*flatten_factor)*(dz*flatten_factor))
+        ys      = np.arange(n)
+        y_norm  = ys / n
+        stripes = (min_strip + y_norm*(max_strip-min_strip)).astype(int)
+        inside  = (distance <= n/2) & ((ys // stripes) % 2 == 0)[None, :, None]
+        # one colour per row
+        vox     = np.argwhere(inside)
+        rgba    = np.empty((len(vox), 4), np.uint8)
+        rgba[:, :3] = color_lut(SUN_COLORS, n)[vox[:, 1]]
+        rgba[:, 3]  = 255
+        return vox, rgba
 
     def update(self, dt, new_w):
         self.weights -= self.weights * (1 - self.decay**(1_000*dt))
@@ -129,72 +336,111 @@ class Visualizer:
         self.sun_off -= dt * 30
 
     def copy(self):
-        c = copy.deepcopy(self)
+        c = Visualizer.__new__(Visualizer)
+        c.__dict__.update(self.__dict__)
+        c.weights = self.weights.copy()  # only mutable attribute
         return c
 
+    # the only per‑frame state render() reads; a few bytes to ship to workers
+    def snapshot(self):
+        return self.z_off, self.weights.copy()
+
+    def restore(self, snap):
+        self.z_off, self.weights = snap
+
+    # The octave noise only depends on the lattice, not on time: evaluate it
+    # once for a window of z rows (with headroom for scrolling) and slice it
+    # per frame; refill when the terrain scrolls past the window.
+    def octave_window(self, dims, spacing, xs, k0, nk):
+        f = self.fields.get(dims)
+        if f is None or not (f[0] <= k0 and k0 + nk <= f[0] + f[1].shape[2]):
+            zs      = (k0 + np.arange(4*nk)) * spacing
+            X, Z    = np.meshgrid(xs, zs, indexing='ij')
+            noise_s = spacing * 0.7  # Reduce noise scale for smoother terrain
+            octave  = octave_fields(xs, zs, dims[0], dims[2], noise_s, self.octaves)
+            disable = np.stack([hash_u8(X, Z, i) < 160  # Slightly more peaks enabled
+                                for i in range(self.octaves)])
+            self.fields[dims] = f = (k0, octave, disable)
+        rows = slice(k0 - f[0], k0 - f[0] + nk)
+        return f[1][:, :, rows], f[2][:, :, rows]
+
     # height‑field → voxel indices
     def render(self, dims):
         w, h, d = dims
         spacing = int(min(w, d)/15)  # Increased spacing to reduce peaks
-        noise_s = spacing * 0.7  # Reduce noise scale for smoother terrain
         v_size  = 1/np.array(dims)
         z_base  = self.z_off * d
         min_z   = (math.floor(z_base/spacing))*spacing
         max_z   = (math.ceil((z_base+d)/spacing))*spacing
-        vox     = []
-
-        def height(x, z):
-            xn, zn = x/w, z/d
-            n = 0
-            for i in range(self.octaves):
-                rand = int(hashlib.md5(f'{x}_{z}_{i}'.encode()).hexdigest()[:2],16)
-                disable = rand < 160  # Slightly more peaks enabled
-                scale = noise_s**(i+1)
-                octave = abs(pnoise2(xn*scale, zn*scale, base=i))
-                # More dramatic music response with higher weight multipliers
-                weight_multiplier = 2.0 if disable else (3.0 * self.weights[i])
-                n += octave * weight_multiplier * (0.3**i)  # Changed from 0.25 to 0.3 for more prominence
-            return max(h * n * (math.cos(xn*2*math.pi)*.5 + .5), v_size[1]/2)
-
-        for x in range(0, w, spacing):
-            for z in range(min_z, max_z, spacing):
-                p0 = np.array([x,               height(x,               z              ), z              ])
-                p1 = np.array([x+spacing,       height(x+spacing,       z              ), z              ])
-                p2 = np.array([x,               height(x,               z+spacing      ), z+spacing      ])
-                p3 = np.array([x+spacing,       height(x+spacing,       z+spacing      ), z+spacing      ])
-                vox += [
-                    rasterize_triangle(dims, p0, p1, p3, spacing, z_base),
-                    rasterize_triangle(dims, p0, p3, p2, spacing, z_base)
-                ]
-        return dims, np.concatenate(vox), spacing, z_base
+
+        # grid vertices: every cell corner, sampled once
+        nx = len(range(0, w, spacing))
+        nz = len(range(min_z, max_z, spacing))
+        xs = np.arange(nx + 1) * spacing
+        zs = np.arange(nz + 1) * spacing + min_z
+        X, Z = np.meshgrid(xs, zs, indexing='ij')
+
+        octave, disable = self.octave_window(dims, spacing, xs, min_z//spacing, nz+1)
+        # More dramatic music response with higher weight multipliers
+        weight_multiplier = np.where(disable, 2.0, 3.0 * self.weights[:, None, None])
+        amp = 0.3**np.arange(self.octaves)  # Changed from 0.25 to 0.3 for more prominence
+        n   = (octave * weight_multiplier * amp[:, None, None]).sum(0)
+        env = np.cos(xs/w*2*math.pi)*.5 + .5
+        H   = np.maximum(h * n * env[:, None], v_size[1]/2)
+
+        # vertices written once into one buffer; each cell's two triangles
+        # (p0,p1,p3) and (p0,p3,p2) are filled from its corner views in place
+        P = np.empty((nx+1, nz+1, 3))
+        P[..., 0], P[..., 1], P[..., 2] = X, H, Z
+        p0, p1 = P[:-1, :-1], P[1:, :-1]
+        p2, p3 = P[:-1, 1:],  P[1:, 1:]
+        tris = np.empty((nx, nz, 2, 3, 3))
+        tris[:, :, :, 0] = p0[:, :, None]
+        tris[:, :, 0, 1] = p1
+        tris[:, :, 0, 2] = tris[:, :, 1, 1] = p3
+        tris[:, :, 1, 2] = p2
+        tris = tris.reshape(-1, 3, 3)
+
+        return dims, rasterize_triangles(dims, tris, z_base), spacing, z_base
 
     def present(self, render_out, sun_n, sun):
         dims, vox, spacing, z_base = render_out
-        frame = splv.Frame(*dims)
-        for x, y, z in vox:
-            if int(z + z_base) % spacing == 0 or x % spacing == 0:
-                col = interpolate_color(
-                    [(25,214,252),(255,20,147),(232,103,23),(232,224,16)],
-                    y/dims[1])
-            else:
-                col = (0,0,0)
-            frame.set_voxel(x, y, z, col)
-
-        # sun
+        x, y, z = vox.T
+        # the stripe test only depends on x or on z: evaluate it once per
+        # column / row and gather, instead of a modulo per voxel
+        on_x    = np.arange(dims[0]) % spacing == 0
+        on_z    = (np.arange(dims[2]) + z_base).astype(int) % spacing == 0
+        grid    = on_z[z] | on_x[x]
+
+        # dense RGBA volume → one bulk Frame construction (alpha marks set
+        # voxels); dims must be multiples of splv's 8‑voxel brick size
+        volume = np.zeros((*dims, 4), np.uint8)
+        volume[x, y, z, :3] = np.where(grid[:, None], color_lut(TERRAIN_COLORS, dims[1])[y], 0)
+        volume[x, y, z, 3]  = 255
+
+        # sun, drawn over the terrain and clipped to the volume
         cx = dims[0]//2
         cy = int(dims[1]*0.5 + self.sun_off/dims[1])
         cz = int(dims[2]*0.9)
-        frame.add(sun,
-                  cx - sun_n//2,
-                  cy - sun_n//2,
-                  cz - sun_n//2)
-        return frame
+        sun_vox, sun_rgba = sun
+        p  = sun_vox + (cx - sun_n//2, cy - sun_n//2, cz - sun_n//2)
+        ok = np.all((p >= 0) & (p < dims), axis=1)
+        volume[tuple(p[ok].T)] = sun_rgba[ok]
+        return splv.Frame(volume)
 
 # ────────────────────────── Driver helpers ────────────────────────── #
 
-def _render_job(args):
-    vis, n = args
-    return vis.render((n, n, n*2))
+_worker = {}
+
+def _init_worker(octaves, density):
+    # one long‑lived Visualizer per process; jobs only carry its snapshot
+    _worker["vis"]  = Visualizer(octaves)
+    _worker["dims"] = (density, density, density*2)
+
+def _render_job(snap):
+    vis = _worker["vis"]
+    vis.restore(snap)
+    return vis.render(_worker["dims"])
 
 # ────────────────────────── Main ────────────────────────── #
 
@@ -223,28 +469,42 @@ def main():
     smp_per_vf = int(audio.sr / fps)
     total_vf   = min(int(audio.frames / ratio), 300)
 
-    batch = mp.cpu_count()
-    bar   = tqdm(total=total_vf, unit="frames")
-
-    with mp.Pool(batch) as pool:
-        for b0 in range(0, total_vf, batch):
-            b1 = min(b0+batch, total_vf)
-            states, pcm_bufs = [], []
-            for i in range(b0, b1):
-                aud_idx = int(i * ratio)
-                vis.update(1/fps, audio.band_frame(aud_idx))
-                states.append(vis.copy())
-
-                s0 = int(i * smp_per_vf)
-                pcm_bufs.append(audio.pcm_frame(s0, smp_per_vf))
-
-            renders = pool.map(_render_job, [(s, density) for s in states])
-
-            for state, ro, pcm in zip(states, renders, pcm_bufs):
-                frame = state.present(ro, sun_n, sun)
-                encoder.encode(frame)
-                encoder.encode_audio(list(pcm))
-            bar.update(b1 - b0)
+    workers = mp.cpu_count()
+    dims    = (density, density, density*2)
+    bar     = tqdm(total=total_vf, unit="frames")
+    window  = deque()  # in‑flight (state, pcm, render job), oldest first
+
+    def encode_oldest():
+        state, pcm, job = window.popleft()
+        frame = state.present(job.get(), sun_n, sun)
+        encoder.encode(frame)
+        encoder.encode_audio(list(pcm))
+        bar.update(1)
+
+    if HAVE_NUMBA:
+        # the compiled kernels release the GIL, so threads can render the
+        # frame states directly – no snapshots or voxel arrays get pickled
+        pool   = ThreadPool(workers)
+        render = lambda state: pool.apply_async(state.render, (dims,))
+    else:
+        pool   = mp.Pool(workers, initializer=_init_worker, initargs=(octaves, density))
+        render = lambda state: pool.apply_async(_render_job, (state.snapshot(),))
+
+    # Keep ~2 frames per worker queued so rendering never waits on the
+    # encoder (and vice versa); results are consumed strictly in order.
+    with pool:
+        for i in range(total_vf):
+            aud_idx = int(i * ratio)
+            vis.update(1/fps, audio.band_frame(aud_idx))
+            state = vis.copy()
+
+            s0  = int(i * smp_per_vf)
+            pcm = audio.pcm_frame(s0, smp_per_vf)
+            window.append((state, pcm, render(state)))
+            if len(window) >= 2*workers:
+                encode_oldest()
+        while window:
+            encode_oldest()
 
     bar.close()
     encoder.finish()
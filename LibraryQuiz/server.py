@@ -3,30 +3,46 @@ Library Quiz Game - Jackbox-style trivia for teens
 FastAPI backend with WebSocket support for real-time gameplay
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Depends
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, FileResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-import json
+import orjson
 import asyncio
-import uuid
+import secrets
 import time
 import random
+import heapq
+import itertools
 import string
+import re
 import socket
-from datetime import datetime
+from datetime import datetime, timezone
+from collections import Counter, deque
+from operator import itemgetter
 from pathlib import Path
 import csv
 import io
 import os
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 import bcrypt
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Library Quiz Game")
+app = FastAPI(title="Library Quiz Game", default_response_class=ORJSONResponse)
+
+# Errors are logged through a queue and written out by a listener thread
+# (started on startup), so a request handler never waits on stderr
+logger = logging.getLogger("libraryquiz")
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+log_listener = QueueListener(_log_queue, logging.StreamHandler())
 
 # ─────────────────────────── CORS Configuration ─────────────────────────── #
 
@@ -58,10 +74,11 @@ else:
     print("   Using local authentication (data/admins.json)")
 
 # Admin session tokens (in-memory)
-admin_sessions: dict[str, dict] = {}  # token -> {username, name, user_id}
+admin_sessions: dict[str, dict] = {}  # token -> {username, name, user_id, expires_at}; username is always set
+ADMIN_SESSION_TTL = 24 * 60 * 60  # seconds a login token stays valid
 
 # Track active hosting sessions per admin
-admin_hosting_sessions: dict[str, str] = {}  # admin_username -> room_code
+admin_hosting_sessions: dict[str, "GameRoom"] = {}  # admin_username -> hosted room
 
 # ─────────────────────────── Password Hashing ─────────────────────────── #
 
@@ -73,6 +90,24 @@ def verify_password(password: str, password_hash: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
+# bcrypt is deliberately slow; cap how many hashes run at once so a burst of
+# logins can't take every core, and limit how often one client may try
+hash_slots = asyncio.Semaphore(os.cpu_count() or 4)
+LOGIN_ATTEMPTS = 5   # per client within LOGIN_WINDOW
+LOGIN_WINDOW = 60    # seconds
+login_attempts: dict[str, deque] = {}  # client ip -> recent attempt times
+
+def check_login_rate(request: Request):
+    """Record a login attempt, raising 429 if the client is over the limit"""
+    ip = request.client.host if request.client else "unknown"
+    now = time.time()
+    attempts = login_attempts.setdefault(ip, deque())
+    while attempts and attempts[0] <= now - LOGIN_WINDOW:
+        attempts.popleft()
+    if len(attempts) >= LOGIN_ATTEMPTS:
+        raise HTTPException(status_code=429, detail="Too many login attempts. Please wait a minute.")
+    attempts.append(now)
+
 # ─────────────────────────── Data Storage ─────────────────────────── #
 
 DATA_DIR = Path("data")
@@ -80,11 +115,39 @@ DATA_DIR.mkdir(exist_ok=True)
 QUESTIONS_FILE = DATA_DIR / "questions.json"
 ADMINS_FILE = DATA_DIR / "admins.json"
 
+# The file helpers below are blocking, so async handlers run them with
+# asyncio.to_thread. Hold this lock around a load-edit-save sequence (and any
+# threaded read) so a save never serializes a dict that is being edited.
+data_lock = asyncio.Lock()
+
+# Parsed JSON files: path -> (mtime_ns, data). A file is only re-read when it
+# changes on disk; callers edit the returned dict in place and save it back.
+_json_cache: dict[Path, tuple[int, dict]] = {}
+
+def read_json_cached(path: Path):
+    """Load a JSON file, reusing the parsed copy while its mtime is unchanged"""
+    mtime = path.stat().st_mtime_ns
+    cached = _json_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    _json_cache[path] = (mtime, data)
+    return data
+
+def write_json_cached(path: Path, data):
+    """Write a JSON file and keep the written data as its cached copy"""
+    # Write beside it and swap it in, so a crash mid-write can't leave a truncated file
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+    _json_cache[path] = (path.stat().st_mtime_ns, data)
+
 def load_admins():
     """Load admin accounts from JSON file (fallback when no Supabase)"""
     if ADMINS_FILE.exists():
-        with open(ADMINS_FILE, "r") as f:
-            return json.load(f)
+        return read_json_cached(ADMINS_FILE)
     # Default admin account
     default = {
         "admins": {
@@ -99,20 +162,33 @@ def load_admins():
 
 def save_admins(data):
     """Save admin accounts to JSON file"""
-    with open(ADMINS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    write_json_cached(ADMINS_FILE, data)
 
 def verify_admin_token(token: str) -> str | None:
-    """Verify admin token and return email/username, or None if invalid"""
-    if token in admin_sessions:
-        return admin_sessions[token].get("email") or admin_sessions[token].get("username")
+    """Verify admin token and return the username, or None if invalid"""
+    session = admin_sessions.get(token)
+    if session and session["expires_at"] > time.time():
+        return session["username"]
+    return None
+
+def get_admin_from_request(request: Request) -> str | None:
+    """Extract and verify admin token from request"""
+    token = request.headers.get("X-Admin-Token") or request.cookies.get("admin_token")
+    if token:
+        return verify_admin_token(token)
     return None
 
+async def require_admin(request: Request) -> str:
+    """Route dependency: the logged-in admin's username, or 401"""
+    username = get_admin_from_request(request)
+    if not username:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return username
+
 def load_questions():
     """Load questions from JSON file"""
     if QUESTIONS_FILE.exists():
-        with open(QUESTIONS_FILE, "r") as f:
-            return json.load(f)
+        return read_json_cached(QUESTIONS_FILE)
     # Default questions with multiple types:
     # type: "choice" (default), "truefalse", "poll", "open_poll", "text", "number", "wager"
     default = {
@@ -234,17 +310,59 @@ def load_questions():
 
 def save_questions(data):
     """Save questions to JSON file"""
-    with open(QUESTIONS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    write_json_cached(QUESTIONS_FILE, data)
+
+# Question id -> (category id, position), for the questions dict it was built from
+_question_index: tuple[dict | None, dict[str, tuple[str, int]]] = (None, {})
+
+def index_questions(questions: dict) -> dict[str, tuple[str, int]]:
+    """The id index for questions, rebuilt in one pass if it belongs to other data"""
+    global _question_index
+    if _question_index[0] is not questions:
+        _question_index = (questions, {
+            q["id"]: (cat_id, i)
+            for cat_id, cat in questions["categories"].items()
+            for i, q in enumerate(cat["questions"])
+        })
+    return _question_index[1]
+
+def find_question(questions: dict, question_id: str) -> tuple[dict, int] | None:
+    """(category, position) of a question by id, or None if there is no such question"""
+    global _question_index
+    for retry in (False, True):
+        if retry:
+            # Edited without going through the index; rebuild once and look again
+            _question_index = (None, {})
+        hit = index_questions(questions).get(question_id)
+        if hit:
+            cat = questions["categories"].get(hit[0])
+            i = hit[1]
+            if cat and i < len(cat["questions"]) and cat["questions"][i]["id"] == question_id:
+                return cat, i
+    return None
 
 
 # ─────────────────────────── Game State ─────────────────────────── #
 
-def generate_room_code():
-    """Generate a 4-letter room code"""
-    return ''.join(random.choices(string.ascii_uppercase, k=4))
+ROOM_CODE_CHARS = string.ascii_uppercase
+
+
+def generate_room_code(taken=()):
+    """Generate a 4-letter room code not in taken"""
+    n = len(ROOM_CODE_CHARS)
+    while True:
+        # One random draw split into four base-26 digits
+        r = random.randrange(n ** 4)
+        code = (ROOM_CODE_CHARS[r % n] + ROOM_CODE_CHARS[r // n % n]
+                + ROOM_CODE_CHARS[r // n ** 2 % n] + ROOM_CODE_CHARS[r // n ** 3])
+        if code not in taken:
+            return code
 
 class Player:
+    # Fixed attribute set: reveal/leaderboard scans hit these for every player
+    __slots__ = ("id", "name", "score", "current_answer", "answer_time",
+                 "streak", "wager", "ws", "team_id")
+    
     def __init__(self, player_id: str, name: str):
         self.id = player_id
         self.name = name
@@ -259,6 +377,8 @@ class Player:
 
 class Team:
     """Represents a team in team mode"""
+    __slots__ = ("id", "name", "color")
+    
     COLORS = ["#e74c3c", "#3498db", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c", "#e91e63", "#00bcd4"]
     NAMES = ["Red Team", "Blue Team", "Green Team", "Orange Team", "Purple Team", "Teal Team", "Pink Team", "Cyan Team"]
     
@@ -281,41 +401,71 @@ class GameRoom:
         self.code = room_code
         self.state = "lobby"
         self.players: dict[str, Player] = {}
+        self.ranking: list[Player] = []  # last leaderboard order, re-sorted on demand
         self.host_ws: WebSocket = None
         self.questions = []
         self.current_question_idx = -1
         self.question_start_time = None
+        self.answered_count = 0  # players with a current_answer for this question
+        self.correct_text = None  # (question, display text) for bowl reveals
+        self.question_snapshot = None  # (question, key, current_question dict) for reconnects
         self.selected_categories = []
         self.questions_per_game = 10
         self.custom_time_limit = None  # None = use question default, 0 = wait for all
         self.last_activity = time.time()  # For room cleanup
         self.host_connected = False  # Track if host is connected
         self.host_admin = None  # Admin username who created/hosts the room
+        self.lock = asyncio.Lock()  # Guards check-then-set of answers and buzzes
         
         # Team mode support
         self.team_mode = False
         self.teams: dict[str, Team] = {}  # team_id -> Team
         
+        # Players/teams part of to_lobby_state, rebuilt only after roster or
+        # team changes (anything touching players, team_id or a Team sets dirty)
+        self.lobby_cache = None
+        self.lobby_dirty = True
+        
+        # Leaderboards, rebuilt only after scores, streaks, roster or teams
+        # change; several messages in a row usually carry the same standings
+        self.leaderboard_cache = None  # (team_mode, leaderboard)
+        self.team_leaderboard_cache = None
+        
         # Bowl mode support
         self.game_mode = "classic"  # "classic" or "bowl"
         self.buzz_winner = None     # player_id who buzzed first
         self.buzz_team = None       # team_id that buzzed
         self.buzz_answer = None     # answer submitted by buzz winner
-        self.steal_eligible = []    # team_ids that can still steal
+        self.steal_eligible: dict[str, None] = {}  # team_ids that can still steal (insertion-ordered set)
         self.awaiting_judgment = False
         self.bowl_phase = None      # "buzzing", "answering", "stealing", None
+        self.is_steal = False       # current buzz cycle is a steal (set on entering "stealing")
         
         # Minigame support
         self.minigame_state = None  # {"type": str, "prompt": str, "start_time": float, "duration": int}
         self.minigame_submissions: dict[str, dict] = {}  # player_id -> {"data": str, "player_name": str, "timestamp": float}
         self.previous_state = None  # State to return to after minigame
+        self.minigame_timer_task: asyncio.Task | None = None  # auto-end timer, cancelled on early end
         
+    def roster_changed(self):
+        """Players or teams changed: lobby state and leaderboards are stale"""
+        self.lobby_dirty = True
+        self.scores_changed()
+    
+    def scores_changed(self):
+        """Scores or streaks changed: drop the cached leaderboards"""
+        self.leaderboard_cache = None
+        self.team_leaderboard_cache = None
+    
     def add_player(self, player: Player):
         self.players[player.id] = player
+        self.roster_changed()
         
     def remove_player(self, player_id: str):
         if player_id in self.players:
-            del self.players[player_id]
+            if self.players.pop(player_id).current_answer is not None:
+                self.answered_count -= 1
+            self.roster_changed()
     
     # ─────────────────────────── Team Management ─────────────────────────── #
     
@@ -332,6 +482,7 @@ class GameRoom:
         
         team = Team(team_id, name, color)
         self.teams[team_id] = team
+        self.roster_changed()
         return team
     
     def delete_team(self, team_id: str) -> bool:
@@ -345,6 +496,7 @@ class GameRoom:
                 player.team_id = None
         
         del self.teams[team_id]
+        self.roster_changed()
         return True
     
     def assign_player_to_team(self, player_id: str, team_id: str | None) -> bool:
@@ -355,6 +507,7 @@ class GameRoom:
             return False
         
         self.players[player_id].team_id = team_id
+        self.roster_changed()
         return True
     
     def get_team_players(self, team_id: str) -> list[Player]:
@@ -371,9 +524,17 @@ class GameRoom:
     
     def get_team_leaderboard(self) -> list[dict]:
         """Get sorted team leaderboard"""
+        if self.team_leaderboard_cache is not None:
+            return self.team_leaderboard_cache
+        # Bucket players by team in one pass instead of a scan per team
+        members = {team_id: [] for team_id in self.teams}
+        for p in self.players.values():
+            if p.team_id in members:
+                members[p.team_id].append(p)
+        
         team_scores = []
         for team_id, team in self.teams.items():
-            players = self.get_team_players(team_id)
+            players = members[team_id]
             total_score = sum(p.score for p in players)
             team_scores.append({
                 "id": team.id,
@@ -384,7 +545,8 @@ class GameRoom:
                 "players": [{"id": p.id, "name": p.name, "score": p.score} for p in players]
             })
         
-        return sorted(team_scores, key=lambda t: -t["score"])
+        self.team_leaderboard_cache = sorted(team_scores, key=itemgetter("score"), reverse=True)
+        return self.team_leaderboard_cache
     
     def auto_assign_teams(self, num_teams: int = 2):
         """Automatically distribute players evenly across teams"""
@@ -400,26 +562,58 @@ class GameRoom:
         team_ids = list(self.teams.keys())[:num_teams]
         for i, player in enumerate(players):
             player.team_id = team_ids[i % num_teams]
+        self.roster_changed()
             
     def get_current_question(self):
         if 0 <= self.current_question_idx < len(self.questions):
             return self.questions[self.current_question_idx]
         return None
     
-    def setup_game(self, categories: list, num_questions: int):
-        """Setup game with selected categories"""
+    def get_question_snapshot(self, question: dict) -> dict:
+        """current_question part of the join message; built once per question, shared by reconnects"""
+        key = (self.current_question_idx, len(self.questions), self.custom_time_limit)
+        if self.question_snapshot is None or self.question_snapshot[0] is not question or self.question_snapshot[1] != key:
+            q_type = question.get("type", "choice")
+            time_limit = self.custom_time_limit if self.custom_time_limit is not None else question.get("time_limit", 15)
+            current = {
+                "type": "question",
+                "question_type": q_type,
+                "question_num": self.current_question_idx + 1,
+                "total_questions": len(self.questions),
+                "question": question["question"],
+                "time_limit": time_limit,
+                "wait_for_all": time_limit == 0
+            }
+            if q_type in ["choice", "poll", "wager"]:
+                current["answers"] = question.get("answers", [])
+            elif q_type == "truefalse":
+                current["answers"] = ["TRUE", "FALSE"]
+            # open_poll, text, and number types don't have predefined answers
+            self.question_snapshot = (question, key, current)
+        return self.question_snapshot[2]
+    
+    def get_correct_text(self) -> str:
+        """Display text for the current question's answer, formatted once per question"""
+        question = self.get_current_question()
+        if self.correct_text is None or self.correct_text[0] is not question:
+            self.correct_text = (question, format_correct_answer(question))
+        return self.correct_text[1]
+    
+    def setup_game(self, categories: list | None, num_questions: int):
+        """Setup game with selected categories (None = all categories)"""
+        # Load questions from selected categories and draw a random subset
+        all_questions = load_questions()
+        if categories is None:
+            categories = list(all_questions["categories"])
         self.selected_categories = categories
         self.questions_per_game = num_questions
         
-        # Load and shuffle questions from selected categories
-        all_questions = load_questions()
         available = []
         for cat_id in categories:
             if cat_id in all_questions["categories"]:
                 available.extend(all_questions["categories"][cat_id]["questions"])
         
-        random.shuffle(available)
-        self.questions = available[:num_questions]
+        self.questions = random.sample(available, max(0, min(num_questions, len(available))))
         
     def calculate_points(self, time_taken: float, time_limit: float):
         """Calculate points based on speed (faster = more points)"""
@@ -431,10 +625,17 @@ class GameRoom:
     
     def get_leaderboard(self):
         """Get sorted leaderboard"""
-        sorted_players = sorted(
-            self.players.values(),
-            key=lambda p: (-p.score, p.name)
-        )
+        if self.leaderboard_cache and self.leaderboard_cache[0] == self.team_mode:
+            return self.leaderboard_cache[1]
+        # Start from the previous order: between calls only a few scores move,
+        # and Timsort is close to linear on nearly-sorted input
+        sorted_players = [p for p in self.ranking if self.players.get(p.id) is p]
+        if len(sorted_players) != len(self.players):
+            ranked = {p.id for p in sorted_players}
+            sorted_players += [p for pid, p in self.players.items() if pid not in ranked]
+        sorted_players.sort(key=lambda p: (-p.score, p.name))
+        self.ranking = sorted_players
+        
         leaderboard = []
         for p in sorted_players:
             entry = {"id": p.id, "name": p.name, "score": p.score, "streak": p.streak}
@@ -444,16 +645,32 @@ class GameRoom:
                 entry["team_name"] = team.name
                 entry["team_color"] = team.color
             leaderboard.append(entry)
+        self.leaderboard_cache = (self.team_mode, leaderboard)
         return leaderboard
     
+    def lobby_roster(self) -> tuple[list[dict], dict[str, dict]]:
+        """(players, teams) as sent to clients; shared, so callers must not mutate them"""
+        if self.lobby_dirty or self.lobby_cache is None:
+            self.lobby_cache = (
+                [{"id": p.id, "name": p.name, "team_id": p.team_id} for p in self.players.values()],
+                {tid: t.to_dict() for tid, t in self.teams.items()}
+            )
+            self.lobby_dirty = False
+        return self.lobby_cache
+    
+    def team_info(self, team_id: str | None) -> dict | None:
+        """A team's dict from the cached roster, or None if it has no such team"""
+        return self.lobby_roster()[1].get(team_id) if team_id else None
+    
     def to_lobby_state(self):
+        players, teams = self.lobby_roster()
         state_data = {
             "room_code": self.code,
             "state": self.state,
-            "players": [{"id": p.id, "name": p.name, "team_id": p.team_id} for p in self.players.values()],
+            "players": players,
             "player_count": len(self.players),
             "team_mode": self.team_mode,
-            "teams": {tid: t.to_dict() for tid, t in self.teams.items()},
+            "teams": teams,
             "game_mode": self.game_mode
         }
         # Include minigame state if active
@@ -476,7 +693,7 @@ class GameRoom:
             state_data["buzz_winner"] = self.buzz_winner
             state_data["buzz_team"] = self.buzz_team
             state_data["awaiting_judgment"] = self.awaiting_judgment
-            state_data["steal_eligible"] = self.steal_eligible
+            state_data["steal_eligible"] = list(self.steal_eligible)
         
         if self.state in ["question", "reveal"] and self.current_question_idx >= 0:
             question = self.get_current_question()
@@ -511,18 +728,17 @@ class GameRoom:
         self.buzz_winner = None
         self.buzz_team = None
         self.buzz_answer = None
-        self.steal_eligible = list(self.teams.keys()) if self.team_mode else []
+        self.steal_eligible = dict.fromkeys(self.teams) if self.team_mode else {}
         self.awaiting_judgment = False
         self.bowl_phase = "buzzing" if self.game_mode == "bowl" else None
+        self.is_steal = False
     
     def handle_buzz(self, player_id: str) -> bool:
         """Handle a buzz attempt. Returns True if this player won the buzz."""
-        if self.bowl_phase != "buzzing":
+        # Losing buzzes are the common case in a race; reject them in one test
+        if self.buzz_winner is not None or self.bowl_phase != "buzzing":
             return False
         
-        if self.buzz_winner is not None:
-            return False  # Already buzzed
-        
         player = self.players.get(player_id)
         if not player:
             return False
@@ -561,52 +777,153 @@ class GameRoom:
 # Active game rooms
 rooms: dict[str, GameRoom] = {}
 
+# Capacity limits, so a runaway client can't grow memory without bound
+MAX_ROOMS = 500
+MAX_PLAYERS_PER_ROOM = 300
+
 # Room cleanup settings
 ROOM_INACTIVE_TIMEOUT = 40 * 60  # 40 minutes in seconds
 
+# Min-heap of (deadline, seq, room), one entry per live room. Activity only bumps
+# room.last_activity; the cleanup task re-pushes entries whose deadline moved on.
+room_expiry: list[tuple[float, int, GameRoom]] = []
+_expiry_seq = itertools.count()
+
+
+def add_room(room: GameRoom):
+    """Register a room and schedule its inactivity check"""
+    rooms[room.code] = room
+    heapq.heappush(room_expiry, (room.last_activity + ROOM_INACTIVE_TIMEOUT, next(_expiry_seq), room))
+
 # ─────────────────────────── WebSocket Manager ─────────────────────────── #
 
-async def broadcast_to_room(room: GameRoom, message: dict, exclude_player: str = None):
-    """Send message to all players in a room"""
-    # Send to host
-    if room.host_ws:
+SEND_TIMEOUT = 2.0  # seconds before a stalled client is dropped
+OUTBOX_LIMIT = 64   # queued messages before a client counts as too far behind
+
+
+def dumps(message: dict) -> str:
+    """Serialize a message once, ready to send as a WebSocket text frame"""
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class Outbox:
+    """Send queue for one WebSocket, drained in order by its own writer task.
+
+    Senders only enqueue, so a broadcast never waits on any socket. A client
+    that errors, stalls past SEND_TIMEOUT or falls OUTBOX_LIMIT messages
+    behind is marked dead and closed with 1011, so it reconnects and gets a
+    fresh snapshot; the next send to it drops it from the room.
+    """
+    __slots__ = ("ws", "queue", "dead", "task")
+
+    def __init__(self, ws: WebSocket):
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOX_LIMIT)
+        self.dead = False
+        self.task = asyncio.create_task(self.writer())
+
+    def put(self, payload) -> bool:
+        """Queue a payload (None = close the socket); False if the client is gone"""
+        if self.dead:
+            return False
         try:
-            await room.host_ws.send_json(message)
-        except:
+            self.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            self.dead = True
+            self.task.cancel()
+            self.task = asyncio.create_task(self.abort())
+            return False
+
+    def kill(self):
+        self.dead = True
+        self.task.cancel()
+
+    async def abort(self):
+        """Close abnormally; the client's reconnect logic skips only code 1000"""
+        try:
+            await asyncio.wait_for(self.ws.close(code=1011), timeout=SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    async def writer(self):
+        try:
+            while True:
+                payload = await self.queue.get()
+                if payload is None:
+                    self.dead = True
+                    await asyncio.wait_for(self.ws.close(), timeout=SEND_TIMEOUT)
+                    return
+                await asyncio.wait_for(self.ws.send_text(payload), timeout=SEND_TIMEOUT)
+        except Exception:
+            self.dead = True
+            await self.abort()
+
+
+outboxes: dict[WebSocket, Outbox] = {}
+
+
+def open_outbox(ws: WebSocket):
+    """Start the writer for a newly accepted connection"""
+    outboxes[ws] = Outbox(ws)
+
+
+def close_outbox(ws: WebSocket):
+    """Stop the writer once its connection handler exits"""
+    outbox = outboxes.pop(ws, None)
+    if outbox:
+        outbox.kill()
+
+
+def enqueue(ws: WebSocket, payload) -> bool:
+    """Hand a payload to a socket's writer; False if it can't take it"""
+    outbox = outboxes.get(ws)
+    return outbox is not None and outbox.put(payload)
+
+
+async def broadcast_to_room(room: GameRoom, message: dict, exclude_player: str = None, include_host: bool = True):
+    """Queue message for the host and all players in a room"""
+    targets = [(None, room.host_ws)] if room.host_ws and include_host else []
+    if room.players:
+        targets += [(pid, player.ws) for pid, player in room.players.items()
+                    if pid != exclude_player and player.ws]
+    if not targets:
+        return  # Nobody connected, don't even serialize
+    payload = dumps(message)
+
+    # Serialize once, enqueue everywhere; each writer task does the actual sending
+    for pid, ws in targets:
+        if enqueue(ws, payload):
+            continue
+        if pid is None:
             room.host_ws = None
-    
-    # Send to players
-    disconnected = []
-    for player_id, player in room.players.items():
-        if player_id != exclude_player and player.ws:
-            try:
-                await player.ws.send_json(message)
-            except:
-                disconnected.append(player_id)
-    
-    for pid in disconnected:
-        if pid in room.players:
+        else:
             room.players[pid].ws = None
 
 
-async def send_to_host(room: GameRoom, message: dict):
-    """Send message only to room host"""
+async def send_to_host(room: GameRoom, message):
+    """Send message only to room host (a dict, or a payload from dumps())"""
     if room.host_ws:
-        try:
-            await room.host_ws.send_json(message)
-        except:
+        payload = message if isinstance(message, str) else dumps(message)
+        if not enqueue(room.host_ws, payload):
             room.host_ws = None
 
 
-async def send_to_player(player: Player, message: dict):
-    """Send message to specific player"""
+async def send_to_player(player: Player, message):
+    """Send message to specific player (a dict, or a payload from dumps())"""
     if player.ws:
-        try:
-            await player.ws.send_json(message)
-        except:
+        payload = message if isinstance(message, str) else dumps(message)
+        if not enqueue(player.ws, payload):
             player.ws = None
 
 
+def notify_and_close(sockets: list, payload: str):
+    """Queue a last message for each socket, then close it once that is sent"""
+    for ws in sockets:
+        enqueue(ws, payload)
+        enqueue(ws, None)
+
+
 # ─────────────────────────── Game Logic ─────────────────────────── #
 
 async def start_question(room: GameRoom):
@@ -642,6 +959,7 @@ async def start_question(room: GameRoom):
         player.current_answer = None
         player.answer_time = None
         player.wager = 0
+    room.answered_count = 0
     
     # Reset bowl state for new question
     if room.game_mode == "bowl":
@@ -674,15 +992,27 @@ async def start_question(room: GameRoom):
     await send_to_host(room, host_data)
     
     # Send to players (without correct answer)
-    for player in room.players.values():
-        player_data = question_data.copy()
-        # For wager questions, include player's current score for wagering
-        if q_type == "wager":
-            player_data["player_score"] = player.score
-        # For bowl mode, include player's team eligibility for stealing
-        if room.game_mode == "bowl" and room.team_mode:
-            player_data["can_buzz"] = player.team_id in room.steal_eligible if room.bowl_phase == "stealing" else True
-        await send_to_player(player, player_data)
+    bowl_teams = room.game_mode == "bowl" and room.team_mode
+    if q_type != "wager" and not bowl_teams:
+        # Same message for everyone: one broadcast, serialized once
+        await broadcast_to_room(room, question_data, include_host=False)
+    else:
+        # Payloads only differ in the per-player fields below, so each
+        # distinct variant is serialized once
+        payloads = {}
+        # Snapshot: the loop awaits per player, and a join or kick must not resize the dict under it
+        for player in list(room.players.values()):
+            extra = {}
+            # For wager questions, include player's current score for wagering
+            if q_type == "wager":
+                extra["player_score"] = player.score
+            # For bowl mode, include player's team eligibility for stealing
+            if bowl_teams:
+                extra["can_buzz"] = player.team_id in room.steal_eligible if room.bowl_phase == "stealing" else True
+            key = tuple(extra.values())
+            if key not in payloads:
+                payloads[key] = dumps({**question_data, **extra})
+            await send_to_player(player, payloads[key])
     
     # Start timer only if there's a time limit (not waiting for all, not bowl mode)
     if time_limit > 0 and room.game_mode != "bowl":
@@ -724,6 +1054,42 @@ def check_answer(question: dict, player_answer, correct_answer) -> bool:
         return player_answer == correct_answer
 
 
+def format_correct_answer(question) -> str:
+    """Display text for a question's correct answer, as shown in bowl reveals"""
+    correct_answer = question.get("correct") if question else None
+    if isinstance(correct_answer, list):
+        return correct_answer[0]
+    elif isinstance(correct_answer, bool):
+        return "TRUE" if correct_answer else "FALSE"
+    elif isinstance(correct_answer, int) and "answers" in question:
+        return question["answers"][correct_answer]
+    return str(correct_answer) if correct_answer else "N/A"
+
+
+def grade_answers(question: dict, answers: list, correct_answer) -> list[bool]:
+    """check_answer for a whole room at once; per-question parsing is done once"""
+    q_type = question.get("type", "choice")
+    if q_type == "text":
+        # Lowercase the accepted answers once instead of once per player
+        accepted = correct_answer if isinstance(correct_answer, list) else [str(correct_answer)]
+        accepted = {a.lower() for a in accepted}
+        return [answer is not None and answer.strip().lower() in accepted for answer in answers]
+    if q_type == "number":
+        try:
+            target = float(correct_answer)
+        except (ValueError, TypeError):
+            return [False] * len(answers)
+        tolerance = question.get("tolerance", 0)
+        graded = []
+        for answer in answers:
+            try:
+                graded.append(answer is not None and abs(float(answer) - target) <= tolerance)
+            except (ValueError, TypeError):
+                graded.append(False)
+        return graded
+    return [check_answer(question, answer, correct_answer) for answer in answers]
+
+
 async def reveal_answer(room: GameRoom):
     """Reveal the correct answer and update scores"""
     if room.state != "question":
@@ -742,74 +1108,73 @@ async def reveal_answer(room: GameRoom):
     # For polls, calculate vote distribution
     poll_results = {}
     if q_type == "poll":
-        for player in room.players.values():
-            if player.current_answer is not None:
-                poll_results[player.current_answer] = poll_results.get(player.current_answer, 0) + 1
+        poll_results = dict(Counter(
+            p.current_answer for p in room.players.values() if p.current_answer is not None
+        ))
     elif q_type == "open_poll":
         # Group similar answers together (case-insensitive, trimmed)
-        answer_groups = {}  # normalized_answer -> {count, original_answers}
-        for player in room.players.values():
-            if player.current_answer is not None:
-                normalized = str(player.current_answer).strip().lower()
-                if normalized:
-                    if normalized not in answer_groups:
-                        answer_groups[normalized] = {"count": 0, "answers": []}
-                    answer_groups[normalized]["count"] += 1
-                    # Keep original answer for display (first occurrence)
-                    if len(answer_groups[normalized]["answers"]) == 0:
-                        answer_groups[normalized]["answers"].append(str(player.current_answer).strip())
+        originals = [str(p.current_answer).strip() for p in room.players.values()
+                     if p.current_answer is not None]
+        counts = Counter(a.lower() for a in originals)
+        first_seen = {}  # normalized_answer -> original text of its first occurrence
+        for original in originals:
+            first_seen.setdefault(original.lower(), original)
         
         # Convert to poll_results format: answer -> count
-        for normalized, group in answer_groups.items():
-            # Use the original answer text (first occurrence)
-            original_answer = group["answers"][0]
-            poll_results[original_answer] = group["count"]
-    
-    # Calculate scores
-    results = []
-    for player in room.players.values():
-        was_correct = check_answer(question, player.current_answer, correct_answer)
+        for normalized, count in counts.items():
+            if normalized:
+                poll_results[first_seen[normalized]] = count
+    
+    # Calculate scores; everything that only depends on the question is worked out once
+    earned = []
+    players = list(room.players.values())
+    graded = grade_answers(question, [p.current_answer for p in players], correct_answer)
+    is_poll = q_type in ("poll", "open_poll")
+    is_wager = q_type == "wager"
+    question_start = room.question_start_time
+    time_limit = room.custom_time_limit if room.custom_time_limit else question.get("time_limit", 15)
+    if time_limit == 0:
+        time_limit = 30  # Default for "wait for all" mode
+    calculate_points = room.calculate_points
+    for player, was_correct in zip(players, graded):
         points_earned = 0
+        wager = player.wager if is_wager else 0
         
-        if q_type in ["poll", "open_poll"]:
+        if is_poll:
             # Polls give participation points only
             if player.current_answer is not None:
                 points_earned = 50
                 player.score += points_earned
         elif was_correct and player.answer_time:
-            time_taken = player.answer_time - room.question_start_time
-            time_limit = room.custom_time_limit if room.custom_time_limit else question.get("time_limit", 15)
-            if time_limit == 0:
-                time_limit = 30  # Default for "wait for all" mode
-            
-            base_points = room.calculate_points(time_taken, time_limit)
-            
             # For wager questions, multiply by wager
-            if q_type == "wager" and player.wager > 0:
-                points_earned = player.wager * 2  # Double the wager if correct
+            if wager > 0:
+                points_earned = wager * 2  # Double the wager if correct
             else:
-                points_earned = base_points
+                points_earned = calculate_points(player.answer_time - question_start, time_limit)
             
             player.score += points_earned
             player.streak += 1
-        elif q_type == "wager" and player.wager > 0:
+        elif wager > 0:
             # Lose wager if wrong
-            player.score = max(0, player.score - player.wager)
-            points_earned = -player.wager
+            player.score = max(0, player.score - wager)
+            points_earned = -wager
             player.streak = 0
         else:
             player.streak = 0
-        
-        results.append({
-            "id": player.id,
-            "name": player.name,
-            "answer": player.current_answer,
-            "wager": player.wager if q_type == "wager" else None,
-            "correct": was_correct,
-            "points_earned": points_earned,
-            "total_score": player.score,
-            "streak": player.streak
-        })
+        earned.append(points_earned)
+    room.scores_changed()
+    
+    # Per-player results, built in one comprehension once all scores are final
+    results = [{
+        "id": player.id,
+        "name": player.name,
+        "answer": player.current_answer,
+        "wager": player.wager if is_wager else None,
+        "correct": was_correct,
+        "points_earned": points_earned,
+        "total_score": player.score,
+        "streak": player.streak
+    } for player, was_correct, points_earned in zip(players, graded, earned)]
     
     # Build reveal message based on question type
     reveal_msg = {
@@ -824,29 +1189,45 @@ async def reveal_answer(room: GameRoom):
     if room.team_mode and room.teams:
         reveal_msg["team_leaderboard"] = room.get_team_leaderboard()
     
-    if q_type == "poll":
-        reveal_msg["poll_results"] = poll_results
-        reveal_msg["answers"] = question.get("answers", [])
-    elif q_type == "open_poll":
-        reveal_msg["poll_results"] = poll_results
-        # Sort by count (descending) for display
-        reveal_msg["sorted_answers"] = sorted(poll_results.items(), key=lambda x: -x[1])
-    elif q_type == "truefalse":
-        reveal_msg["correct_answer"] = correct_answer
-        reveal_msg["correct_text"] = "TRUE" if correct_answer else "FALSE"
-    elif q_type == "number":
-        reveal_msg["correct_answer"] = correct_answer
-        reveal_msg["correct_text"] = str(correct_answer)
-    elif q_type == "text":
-        reveal_msg["correct_answer"] = correct_answer[0] if isinstance(correct_answer, list) else correct_answer
-        reveal_msg["correct_text"] = correct_answer[0] if isinstance(correct_answer, list) else str(correct_answer)
-    else:  # choice, wager
-        reveal_msg["correct_answer"] = correct_answer
-        reveal_msg["correct_text"] = question["answers"][correct_answer] if "answers" in question else str(correct_answer)
+    reveal_msg.update(REVEAL_FIELDS.get(q_type, reveal_choice)(question, correct_answer, poll_results))
     
     await broadcast_to_room(room, reveal_msg)
 
 
+# Per-type reveal fields: (question, correct_answer, poll_results) -> extra message keys
+
+def reveal_poll(question, correct_answer, poll_results):
+    return {"poll_results": poll_results, "answers": question.get("answers", [])}
+
+def reveal_open_poll(question, correct_answer, poll_results):
+    # Sort by count (descending) for display
+    return {"poll_results": poll_results,
+            "sorted_answers": sorted(poll_results.items(), key=itemgetter(1), reverse=True)}
+
+def reveal_truefalse(question, correct_answer, poll_results):
+    return {"correct_answer": correct_answer, "correct_text": "TRUE" if correct_answer else "FALSE"}
+
+def reveal_number(question, correct_answer, poll_results):
+    return {"correct_answer": correct_answer, "correct_text": str(correct_answer)}
+
+def reveal_text(question, correct_answer, poll_results):
+    if isinstance(correct_answer, list):
+        return {"correct_answer": correct_answer[0], "correct_text": correct_answer[0]}
+    return {"correct_answer": correct_answer, "correct_text": str(correct_answer)}
+
+def reveal_choice(question, correct_answer, poll_results):  # choice, wager
+    return {"correct_answer": correct_answer,
+            "correct_text": question["answers"][correct_answer] if "answers" in question else str(correct_answer)}
+
+REVEAL_FIELDS = {
+    "poll": reveal_poll,
+    "open_poll": reveal_open_poll,
+    "truefalse": reveal_truefalse,
+    "number": reveal_number,
+    "text": reveal_text,
+}
+
+
 async def end_game(room: GameRoom):
     """End the game and show final results"""
     room.state = "finished"
@@ -891,7 +1272,7 @@ async def start_minigame(room: GameRoom, minigame_type: str, prompt: str = None,
     
     # If duration is set, auto-end after duration
     if duration > 0:
-        asyncio.create_task(minigame_timer(room, duration))
+        room.minigame_timer_task = asyncio.create_task(minigame_timer(room, duration))
 
 
 async def minigame_timer(room: GameRoom, duration: int):
@@ -907,6 +1288,12 @@ async def end_minigame(room: GameRoom):
     if room.state != "minigame":
         return
     
+    # Ended early: stop the timer so it can't end a later minigame
+    timer = room.minigame_timer_task
+    room.minigame_timer_task = None
+    if timer and not timer.done() and timer is not asyncio.current_task():
+        timer.cancel()
+    
     # Prepare submissions for display
     submissions_list = []
     for player_id, submission in room.minigame_submissions.items():
@@ -951,46 +1338,81 @@ async def end_minigame(room: GameRoom):
 
 # ─────────────────────────── Room Cleanup ─────────────────────────── #
 
+INACTIVE_CLOSED_MSG = dumps({
+    "type": "room_closed",
+    "message": "Room closed due to inactivity"
+})
+
 async def cleanup_inactive_rooms():
     """Background task to clean up inactive rooms"""
     while True:
-        await asyncio.sleep(60)  # Check every minute
+        # Sleep until the earliest deadline instead of polling every minute;
+        # rooms created meanwhile can't be due before a full timeout
+        next_due = room_expiry[0][0] - time.time() if room_expiry else ROOM_INACTIVE_TIMEOUT
+        await asyncio.sleep(max(next_due, 1))
         
         current_time = time.time()
         rooms_to_delete = []
         
-        for room_code, room in rooms.items():
+        # Only rooms whose scheduled deadline has passed are looked at
+        while room_expiry and room_expiry[0][0] < current_time:
+            _, seq, room = heapq.heappop(room_expiry)
+            room_code = room.code
+            if rooms.get(room_code) is not room:
+                continue  # Already closed (or code reused by a newer room)
             inactive_time = current_time - room.last_activity
             
             # Delete rooms inactive for ROOM_INACTIVE_TIMEOUT
-            if inactive_time > ROOM_INACTIVE_TIMEOUT:
+            if inactive_time <= ROOM_INACTIVE_TIMEOUT:
+                heapq.heappush(room_expiry, (room.last_activity + ROOM_INACTIVE_TIMEOUT, seq, room))
+            else:
                 rooms_to_delete.append(room_code)
                 print(f"🧹 Cleaning up inactive room: {room_code} (inactive for {int(inactive_time/60)} mins)")
                 
+                del rooms[room_code]
+                
                 # Notify any remaining players
-                for player in room.players.values():
-                    if player.ws:
-                        try:
-                            await player.ws.send_json({
-                                "type": "room_closed",
-                                "message": "Room closed due to inactivity"
-                            })
-                            await player.ws.close()
-                        except:
-                            pass
-        
-        for room_code in rooms_to_delete:
-            del rooms[room_code]
+                notify_and_close([p.ws for p in room.players.values() if p.ws], INACTIVE_CLOSED_MSG)
         
         if rooms_to_delete:
             print(f"🧹 Cleaned up {len(rooms_to_delete)} inactive rooms. Active rooms: {len(rooms)}")
 
+async def cleanup_admin_sessions():
+    """Background task to drop expired admin sessions and stale login bookkeeping"""
+    while True:
+        await asyncio.sleep(10 * 60)
+        
+        current_time = time.time()
+        expired = [token for token, session in admin_sessions.items() if session["expires_at"] <= current_time]
+        for token in expired:
+            del admin_sessions[token]
+        
+        if expired:
+            print(f"🧹 Expired {len(expired)} admin sessions. Active sessions: {len(admin_sessions)}")
+        
+        # Drop stale Supabase admin lookups
+        for username in [u for u, (fetched, _) in admin_lookup_cache.items()
+                         if fetched <= current_time - ADMIN_LOOKUP_TTL]:
+            del admin_lookup_cache[username]
+        
+        # Forget clients with no login attempts left in the rate-limit window
+        for ip in [ip for ip, attempts in login_attempts.items()
+                   if not attempts or attempts[-1] <= current_time - LOGIN_WINDOW]:
+            del login_attempts[ip]
+
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on server startup"""
+    log_listener.start()
     asyncio.create_task(cleanup_inactive_rooms())
+    asyncio.create_task(cleanup_admin_sessions())
     print("🧹 Room cleanup task started (timeout: 40 mins)")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush any queued log records"""
+    log_listener.stop()
+
 
 # ─────────────────────────── WebSocket Endpoints ─────────────────────────── #
 
@@ -999,46 +1421,48 @@ async def host_websocket(websocket: WebSocket, room_code: str, token: str = None
     """WebSocket for the host/display screen - requires admin authentication"""
     await websocket.accept()
     
-    # Verify admin token
-    if not token or token not in admin_sessions:
-        await websocket.send_json({
+    # Verify admin token (rejects expired sessions too)
+    username = verify_admin_token(token) if token else None
+    if not username:
+        await websocket.send_text(dumps({
             "type": "error",
             "message": "Authentication required. Please login as admin."
-        })
+        }))
         await websocket.close(code=4001, reason="Unauthorized")
         return
     
-    admin_info = admin_sessions[token]
-    
     if room_code not in rooms:
-        rooms[room_code] = GameRoom(room_code)
+        if len(rooms) >= MAX_ROOMS:
+            await websocket.send_text(dumps({
+                "type": "error",
+                "message": "Server is at capacity. Please try again later."
+            }))
+            await websocket.close()
+            return
+        add_room(GameRoom(room_code))
     
     room = rooms[room_code]
+    open_outbox(websocket)
     room.host_ws = websocket
     room.host_connected = True
-    room.host_admin = admin_info.get("username") or admin_info.get("email", "admin")
+    room.host_admin = username
     room.update_activity()
     
     # Send current state (full state for reconnection)
-    await websocket.send_json({
+    await send_to_host(room, {
         "type": "room_state",
         **room.to_full_state()
     })
     
     # Notify players that host (re)connected
-    for player in room.players.values():
-        if player.ws:
-            try:
-                await player.ws.send_json({
-                    "type": "host_connected",
-                    "message": "Host is connected"
-                })
-            except:
-                pass
+    await broadcast_to_room(room, {
+        "type": "host_connected",
+        "message": "Host is connected"
+    }, include_host=False)
     
     try:
         while True:
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
             room.update_activity()
             await handle_host_message(room, data)
     except WebSocketDisconnect:
@@ -1051,6 +1475,7 @@ async def host_websocket(websocket: WebSocket, room_code: str, token: str = None
             if room.team_mode and len(room.steal_eligible) > 0:
                 # Transition to steal phase
                 room.bowl_phase = "stealing"
+                room.is_steal = True
                 room.buzz_winner = None
                 room.buzz_team = None
                 room.buzz_answer = None
@@ -1059,25 +1484,11 @@ async def host_websocket(websocket: WebSocket, room_code: str, token: str = None
                 await broadcast_to_room(room, {
                     "type": "bowl_host_disconnected_steal",
                     "message": "Host disconnected. Other teams can now steal!",
-                    "steal_eligible": room.steal_eligible
+                    "steal_eligible": list(room.steal_eligible)
                 })
             else:
                 # No steal possible - reveal answer
-                question = room.get_current_question()
-                correct_answer = question.get("correct") if question else None
-                
-                # Format correct answer for display
-                if question:
-                    if isinstance(correct_answer, list):
-                        correct_text = correct_answer[0]
-                    elif isinstance(correct_answer, bool):
-                        correct_text = "TRUE" if correct_answer else "FALSE"
-                    elif isinstance(correct_answer, int) and "answers" in question:
-                        correct_text = question["answers"][correct_answer]
-                    else:
-                        correct_text = str(correct_answer) if correct_answer else "N/A"
-                else:
-                    correct_text = "N/A"
+                correct_text = room.get_correct_text()
                 
                 await broadcast_to_room(room, {
                     "type": "bowl_host_disconnected_reveal",
@@ -1091,17 +1502,72 @@ async def host_websocket(websocket: WebSocket, room_code: str, token: str = None
                 room.reset_bowl_state()
         
         # Notify all players that host disconnected
-        for player in room.players.values():
-            if player.ws:
-                try:
-                    await player.ws.send_json({
-                        "type": "host_disconnected",
-                        "message": "Host disconnected. Waiting for host to reconnect..."
-                    })
-                except:
-                    pass
+        await broadcast_to_room(room, {
+            "type": "host_disconnected",
+            "message": "Host disconnected. Waiting for host to reconnect..."
+        }, include_host=False)
         
         print(f"⚠️ Host disconnected from room {room_code}")
+    finally:
+        close_outbox(websocket)
+
+
+def build_join_msg(room: GameRoom, player: Player) -> dict:
+    """The joined message, with whatever game state a (re)connecting player needs"""
+    join_msg = {
+        "type": "joined",
+        "player_id": player.id,
+        "player_name": player.name,
+        "room_code": room.code,
+        "state": room.state,
+        "host_connected": room.host_connected,
+        "score": player.score,
+        "team_id": player.team_id,
+        "team": room.team_info(player.team_id)
+    }
+    
+    # Include minigame state if active
+    if room.state == "minigame" and room.minigame_state:
+        join_msg["minigame_state"] = room.minigame_state
+    
+    # If game is in progress, send current question info
+    if room.state != "question" or room.current_question_idx < 0:
+        return join_msg
+    question = room.get_current_question()
+    if not question:
+        return join_msg
+    
+    current = room.get_question_snapshot(question)
+    if current["question_type"] == "wager":
+        current = {**current, "player_score": player.score}
+    join_msg["current_question"] = current
+    
+    # Check if player already answered
+    if player.current_answer is not None:
+        join_msg["already_answered"] = True
+    
+    # Include bowl mode state if in bowl mode
+    if room.game_mode == "bowl":
+        join_msg["bowl_phase"] = room.bowl_phase
+        join_msg["buzz_winner"] = room.buzz_winner
+        join_msg["awaiting_judgment"] = room.awaiting_judgment
+        join_msg["steal_eligible"] = list(room.steal_eligible)
+        
+        # Determine if this player can buzz
+        if room.bowl_phase == "stealing":
+            join_msg["can_buzz"] = player.team_id in room.steal_eligible if player.team_id else False
+        elif room.bowl_phase == "buzzing":
+            join_msg["can_buzz"] = True
+        else:
+            join_msg["can_buzz"] = False
+        
+        # If this player is the buzz winner, indicate they can answer
+        if room.buzz_winner == player.id and room.bowl_phase == "answering":
+            join_msg["is_buzz_winner"] = True
+            if not room.awaiting_judgment:
+                join_msg["can_submit_answer"] = True
+    
+    return join_msg
 
 
 @app.websocket("/ws/play/{room_code}/{player_id}")
@@ -1110,7 +1576,7 @@ async def player_websocket(websocket: WebSocket, room_code: str, player_id: str)
     await websocket.accept()
     
     if room_code not in rooms:
-        await websocket.send_json({"type": "error", "message": "Room not found"})
+        await websocket.send_text(dumps({"type": "error", "message": "Room not found"}))
         await websocket.close()
         return
     
@@ -1118,85 +1584,22 @@ async def player_websocket(websocket: WebSocket, room_code: str, player_id: str)
     room.update_activity()
     
     if player_id not in room.players:
-        await websocket.send_json({"type": "error", "message": "Player not in room"})
+        await websocket.send_text(dumps({"type": "error", "message": "Player not in room"}))
         await websocket.close()
         return
     
     player = room.players[player_id]
+    open_outbox(websocket)
     player.ws = websocket
     
     # Build join message with full game state for mid-game reconnection
-    join_msg = {
-        "type": "joined",
-        "player_id": player.id,
-        "player_name": player.name,
-        "room_code": room.code,
-        "state": room.state,
-        "host_connected": room.host_connected,
-        "score": player.score,
-        "team_id": player.team_id,
-        "team": room.teams[player.team_id].to_dict() if player.team_id and player.team_id in room.teams else None
-    }
-    
-    # Include minigame state if active
-    if room.state == "minigame" and room.minigame_state:
-        join_msg["minigame_state"] = room.minigame_state
-    
-    # If game is in progress, send current question info
-    if room.state == "question" and room.current_question_idx >= 0:
-        question = room.get_current_question()
-        if question:
-            q_type = question.get("type", "choice")
-            time_limit = room.custom_time_limit if room.custom_time_limit is not None else question.get("time_limit", 15)
-            
-            join_msg["current_question"] = {
-                "type": "question",
-                "question_type": q_type,
-                "question_num": room.current_question_idx + 1,
-                "total_questions": len(room.questions),
-                "question": question["question"],
-                "time_limit": time_limit,
-                "wait_for_all": time_limit == 0
-            }
-            
-            if q_type in ["choice", "poll", "wager"]:
-                join_msg["current_question"]["answers"] = question.get("answers", [])
-                if q_type == "wager":
-                    join_msg["current_question"]["player_score"] = player.score
-            elif q_type == "truefalse":
-                join_msg["current_question"]["answers"] = ["TRUE", "FALSE"]
-            # open_poll, text, and number types don't have predefined answers
-            
-            # Check if player already answered
-            if player.current_answer is not None:
-                join_msg["already_answered"] = True
-            
-            # Include bowl mode state if in bowl mode
-            if room.game_mode == "bowl":
-                join_msg["bowl_phase"] = room.bowl_phase
-                join_msg["buzz_winner"] = room.buzz_winner
-                join_msg["awaiting_judgment"] = room.awaiting_judgment
-                join_msg["steal_eligible"] = room.steal_eligible
-                
-                # Determine if this player can buzz
-                if room.bowl_phase == "stealing":
-                    join_msg["can_buzz"] = player.team_id in room.steal_eligible if player.team_id else False
-                elif room.bowl_phase == "buzzing":
-                    join_msg["can_buzz"] = True
-                else:
-                    join_msg["can_buzz"] = False
-                
-                # If this player is the buzz winner, indicate they can answer
-                if room.buzz_winner == player.id and room.bowl_phase == "answering":
-                    join_msg["is_buzz_winner"] = True
-                    if not room.awaiting_judgment:
-                        join_msg["can_submit_answer"] = True
+    join_msg = build_join_msg(room, player)
     
-    await websocket.send_json(join_msg)
+    await send_to_player(player, join_msg)
     
     try:
         while True:
-            data = await websocket.receive_json()
+            data = orjson.loads(await websocket.receive_text())
             room.update_activity()
             await handle_player_message(room, player, data)
     except WebSocketDisconnect:
@@ -1208,6 +1611,7 @@ async def player_websocket(websocket: WebSocket, room_code: str, player_id: str)
             if room.team_mode and len(room.steal_eligible) > 0:
                 # Transition to steal phase
                 room.bowl_phase = "stealing"
+                room.is_steal = True
                 room.buzz_winner = None
                 room.buzz_team = None
                 room.buzz_answer = None
@@ -1219,25 +1623,11 @@ async def player_websocket(websocket: WebSocket, room_code: str, player_id: str)
                     "player_id": player.id,
                     "player_name": player.name,
                     "message": f"{player.name} disconnected. Other teams can now steal!",
-                    "steal_eligible": room.steal_eligible
+                    "steal_eligible": list(room.steal_eligible)
                 })
             else:
                 # No one can steal - reset bowl state and reveal answer
-                question = room.get_current_question()
-                correct_answer = question.get("correct") if question else None
-                
-                # Format correct answer for display
-                if question:
-                    if isinstance(correct_answer, list):
-                        correct_text = correct_answer[0]
-                    elif isinstance(correct_answer, bool):
-                        correct_text = "TRUE" if correct_answer else "FALSE"
-                    elif isinstance(correct_answer, int) and "answers" in question:
-                        correct_text = question["answers"][correct_answer]
-                    else:
-                        correct_text = str(correct_answer) if correct_answer else "N/A"
-                else:
-                    correct_text = "N/A"
+                correct_text = room.get_correct_text()
                 
                 await broadcast_to_room(room, {
                     "type": "bowl_buzz_winner_disconnected",
@@ -1255,8 +1645,10 @@ async def player_websocket(websocket: WebSocket, room_code: str, player_id: str)
             "type": "player_disconnected",
             "player_id": player.id,
             "player_name": player.name,
-            "player_count": len([p for p in room.players.values() if p.ws])
+            "player_count": sum(1 for p in room.players.values() if p.ws)
         })
+    finally:
+        close_outbox(websocket)
 
 
 async def handle_host_message(room: GameRoom, data: dict):
@@ -1264,11 +1656,12 @@ async def handle_host_message(room: GameRoom, data: dict):
     msg_type = data.get("type")
     
     if msg_type == "start_game":
-        categories = data.get("categories", list(load_questions()["categories"].keys()))
         num_questions = data.get("num_questions", 10)
         time_limit = data.get("time_limit", None)  # None = use default, 0 = wait for all
         
-        room.setup_game(categories, num_questions)
+        # The questions file is read (or taken from cache) once, inside setup_game
+        async with data_lock:
+            await asyncio.to_thread(room.setup_game, data.get("categories"), num_questions)
         room.custom_time_limit = time_limit
         room.current_question_idx = -1
         
@@ -1300,6 +1693,7 @@ async def handle_host_message(room: GameRoom, data: dict):
             player.score = 0
             player.streak = 0
             # Keep team assignments when resetting
+        room.scores_changed()
         await broadcast_to_room(room, {
             "type": "room_reset",
             **room.to_lobby_state()
@@ -1310,8 +1704,7 @@ async def handle_host_message(room: GameRoom, data: dict):
         if player_id in room.players:
             player = room.players[player_id]
             if player.ws:
-                await player.ws.send_json({"type": "kicked"})
-                await player.ws.close()
+                notify_and_close([player.ws], dumps({"type": "kicked"}))
             room.remove_player(player_id)
             await broadcast_to_room(room, {
                 "type": "player_left",
@@ -1336,7 +1729,7 @@ async def handle_host_message(room: GameRoom, data: dict):
                 "type": "game_mode_changed",
                 "game_mode": room.game_mode,
                 "team_mode": room.team_mode,
-                "teams": {tid: t.to_dict() for tid, t in room.teams.items()}
+                "teams": room.lobby_roster()[1]
             })
     
     # ─────────────────────────── Bowl Mode Host Handlers ─────────────────────────── #
@@ -1365,6 +1758,7 @@ async def handle_host_message(room: GameRoom, data: dict):
             # Reset bowl state - transition to steal if possible, otherwise reveal
             if room.team_mode and len(room.steal_eligible) > 0:
                 room.bowl_phase = "stealing"
+                room.is_steal = True
                 room.buzz_winner = None
                 room.buzz_team = None
                 room.buzz_answer = None
@@ -1373,24 +1767,11 @@ async def handle_host_message(room: GameRoom, data: dict):
                 await broadcast_to_room(room, {
                     "type": "bowl_reset_steal",
                     "message": "Other teams can now steal!",
-                    "steal_eligible": room.steal_eligible
+                    "steal_eligible": list(room.steal_eligible)
                 })
             else:
                 # No steal possible - reveal answer
-                question = room.get_current_question()
-                correct_answer = question.get("correct") if question else None
-                
-                if question:
-                    if isinstance(correct_answer, list):
-                        correct_text = correct_answer[0]
-                    elif isinstance(correct_answer, bool):
-                        correct_text = "TRUE" if correct_answer else "FALSE"
-                    elif isinstance(correct_answer, int) and "answers" in question:
-                        correct_text = question["answers"][correct_answer]
-                    else:
-                        correct_text = str(correct_answer) if correct_answer else "N/A"
-                else:
-                    correct_text = "N/A"
+                correct_text = room.get_correct_text()
                 
                 await broadcast_to_room(room, {
                     "type": "bowl_reset_reveal",
@@ -1406,13 +1787,14 @@ async def handle_host_message(room: GameRoom, data: dict):
             return
         
         # Determine if this was a steal attempt
-        is_steal = len(room.steal_eligible) < len(room.teams) if room.team_mode else False
+        is_steal = room.is_steal
         
         if is_correct:
             # Award points
             points = 5 if is_steal else 10  # Steal is worth less
             player.score += points
             player.streak += 1
+            room.scores_changed()
             
             # Get the correct answer for display
             question = room.get_current_question()
@@ -1442,15 +1824,16 @@ async def handle_host_message(room: GameRoom, data: dict):
         else:
             # Wrong answer
             player.streak = 0
+            room.scores_changed()
             
             # Remove this team from steal eligibility
-            if player.team_id and player.team_id in room.steal_eligible:
-                room.steal_eligible.remove(player.team_id)
+            room.steal_eligible.pop(player.team_id, None)
             
             # Check if any teams can still steal
             if room.team_mode and len(room.steal_eligible) > 0:
                 # Start steal phase
                 room.bowl_phase = "stealing"
+                room.is_steal = True
                 room.buzz_winner = None
                 room.buzz_team = None
                 room.buzz_answer = None
@@ -1460,23 +1843,12 @@ async def handle_host_message(room: GameRoom, data: dict):
                     "player_id": player.id,
                     "player_name": player.name,
                     "team_id": player.team_id,
-                    "steal_eligible": room.steal_eligible,
+                    "steal_eligible": list(room.steal_eligible),
                     "message": "Incorrect! Other teams can steal..."
                 })
             else:
                 # No one can steal - reveal the answer
-                question = room.get_current_question()
-                correct_answer = question.get("correct") if question else None
-                
-                # Format correct answer for display
-                if isinstance(correct_answer, list):
-                    correct_text = correct_answer[0]
-                elif isinstance(correct_answer, bool):
-                    correct_text = "TRUE" if correct_answer else "FALSE"
-                elif isinstance(correct_answer, int) and "answers" in question:
-                    correct_text = question["answers"][correct_answer]
-                else:
-                    correct_text = str(correct_answer) if correct_answer else "N/A"
+                correct_text = room.get_correct_text()
                 
                 await broadcast_to_room(room, {
                     "type": "bowl_no_correct",
@@ -1510,17 +1882,7 @@ async def handle_host_message(room: GameRoom, data: dict):
             })
             return
         
-        correct_answer = question.get("correct")
-        
-        # Format correct answer
-        if isinstance(correct_answer, list):
-            correct_text = correct_answer[0]
-        elif isinstance(correct_answer, bool):
-            correct_text = "TRUE" if correct_answer else "FALSE"
-        elif isinstance(correct_answer, int) and "answers" in question:
-            correct_text = question["answers"][correct_answer]
-        else:
-            correct_text = str(correct_answer) if correct_answer else "N/A"
+        correct_text = room.get_correct_text()
         
         await broadcast_to_room(room, {
             "type": "bowl_steal_skipped",
@@ -1554,9 +1916,13 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
     msg_type = data.get("type")
     
     if msg_type == "answer":
-        if room.state == "question" and player.current_answer is None:
+        async with room.lock:
+            if room.state != "question" or player.current_answer is not None:
+                return
             player.current_answer = data.get("answer")
             player.answer_time = time.time()
+            if player.current_answer is not None:
+                room.answered_count += 1
             
             # Handle wager if provided
             wager = data.get("wager", 0)
@@ -1564,25 +1930,26 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
                 # Limit wager to player's current score (min 100 if they have points)
                 max_wager = min(player.score, 500)
                 player.wager = max(100, min(wager, max_wager)) if player.score >= 100 else 0
-            
-            # Notify host that player answered
-            await send_to_host(room, {
-                "type": "player_answered",
-                "player_id": player.id,
-                "player_name": player.name,
-                "answers_in": sum(1 for p in room.players.values() if p.current_answer is not None),
-                "total_players": len(room.players)
-            })
-            
-            # Confirm to player
-            await send_to_player(player, {
-                "type": "answer_received",
-                "answer": player.current_answer,
-                "wager": player.wager
-            })
-            
-            # If all players answered, reveal early
-            if all(p.current_answer is not None for p in room.players.values()):
+        
+        # Notify host that player answered
+        await send_to_host(room, {
+            "type": "player_answered",
+            "player_id": player.id,
+            "player_name": player.name,
+            "answers_in": room.answered_count,
+            "total_players": len(room.players)
+        })
+        
+        # Confirm to player
+        await send_to_player(player, {
+            "type": "answer_received",
+            "answer": player.current_answer,
+            "wager": player.wager
+        })
+        
+        # If all players answered, reveal early (once, even if the last answers race)
+        async with room.lock:
+            if room.state == "question" and room.answered_count == len(room.players):
                 await reveal_answer(room)
     
     # ─────────────────────────── Bowl Mode Handlers ─────────────────────────── #
@@ -1592,13 +1959,12 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
         if room.game_mode != "bowl" or room.state != "question":
             return
         
-        won_buzz = room.handle_buzz(player.id)
+        async with room.lock:
+            won_buzz = room.handle_buzz(player.id)
         
         if won_buzz:
             # Get team info if in team mode
-            team_info = None
-            if player.team_id and player.team_id in room.teams:
-                team_info = room.teams[player.team_id].to_dict()
+            team_info = room.team_info(player.team_id)
             
             # Notify all players who won the buzz
             await broadcast_to_room(room, {
@@ -1626,20 +1992,19 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
         if room.game_mode != "bowl" or room.state != "question":
             return
         
-        if room.buzz_winner != player.id:
-            return  # Only the buzz winner can submit
-        
-        if room.bowl_phase != "answering":
-            return
-        
-        answer = data.get("answer", "").strip()
-        room.buzz_answer = answer
-        room.awaiting_judgment = True
+        async with room.lock:
+            if room.buzz_winner != player.id:
+                return  # Only the buzz winner can submit
+            
+            if room.bowl_phase != "answering":
+                return
+            
+            answer = data.get("answer", "").strip()
+            room.buzz_answer = answer
+            room.awaiting_judgment = True
         
         # Get team info
-        team_info = None
-        if player.team_id and player.team_id in room.teams:
-            team_info = room.teams[player.team_id].to_dict()
+        team_info = room.team_info(player.team_id)
         
         # Notify host to judge
         await send_to_host(room, {
@@ -1649,7 +2014,7 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
             "team_id": player.team_id,
             "team": team_info,
             "answer": answer,
-            "is_steal": len(room.steal_eligible) < len(room.teams) if room.team_mode else False
+            "is_steal": room.is_steal
         })
         
         # Confirm to player
@@ -1660,13 +2025,11 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
         })
         
         # Notify other players
-        for p in room.players.values():
-            if p.id != player.id and p.ws:
-                await send_to_player(p, {
-                    "type": "awaiting_judgment",
-                    "player_name": player.name,
-                    "team_id": player.team_id
-                })
+        await broadcast_to_room(room, {
+            "type": "awaiting_judgment",
+            "player_name": player.name,
+            "team_id": player.team_id
+        }, exclude_player=player.id, include_host=False)
     
     elif msg_type == "steal_buzz":
         # Player attempting to steal
@@ -1676,12 +2039,11 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
         if room.bowl_phase != "stealing":
             return
         
-        won_steal = room.handle_steal_buzz(player.id)
+        async with room.lock:
+            won_steal = room.handle_steal_buzz(player.id)
         
         if won_steal:
-            team_info = None
-            if player.team_id and player.team_id in room.teams:
-                team_info = room.teams[player.team_id].to_dict()
+            team_info = room.team_info(player.team_id)
             
             # Notify all players who won the steal
             await broadcast_to_room(room, {
@@ -1736,38 +2098,27 @@ async def handle_player_message(room: GameRoom, player: Player, data: dict):
 # ─────────────────────────── HTTP Routes ─────────────────────────── #
 
 @app.post("/api/room/create")
-async def create_room(request: Request):
+async def create_room(admin_username: str = Depends(require_admin)):
     """Create a new game room - requires admin authentication"""
-    # Verify admin token
-    token = request.headers.get("X-Admin-Token")
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required to host a game")
-    
-    admin_info = admin_sessions[token]
-    admin_username = admin_info.get("username") or admin_info.get("email", "admin")
-    
     # Check if admin already has an active session
-    if admin_username in admin_hosting_sessions:
-        existing_room_code = admin_hosting_sessions[admin_username]
-        if existing_room_code in rooms:
-            raise HTTPException(
-                status_code=409, 
-                detail=f"You already have an active session (Room: {existing_room_code}). Close it first or rejoin."
-            )
-        else:
-            # Room was cleaned up, remove stale reference
-            del admin_hosting_sessions[admin_username]
+    existing_room = hosted_room(admin_username)
+    if existing_room:
+        raise HTTPException(
+            status_code=409, 
+            detail=f"You already have an active session (Room: {existing_room.code}). Close it first or rejoin."
+        )
     
-    code = generate_room_code()
-    while code in rooms:
-        code = generate_room_code()
+    if len(rooms) >= MAX_ROOMS:
+        raise HTTPException(status_code=503, detail="Server is at capacity. Please try again later.")
+    
+    code = generate_room_code(rooms)
     
     room = GameRoom(code)
     room.host_admin = admin_username
-    rooms[code] = room
+    add_room(room)
     
     # Track this admin's active session
-    admin_hosting_sessions[admin_username] = code
+    admin_hosting_sessions[admin_username] = room
     
     return {"room_code": code, "host": admin_username}
 
@@ -1791,17 +2142,22 @@ async def join_room(room_code: str, request: Request):
     if not name:
         raise HTTPException(status_code=400, detail="Name is required")
     
-    player_id = str(uuid.uuid4())[:8]
+    # Checked after the body is read: nothing below awaits before add_player
+    if len(room.players) >= MAX_PLAYERS_PER_ROOM:
+        raise HTTPException(status_code=403, detail="Room is full")
+    
+    player_id = secrets.token_hex(4)
+    while player_id in room.players:
+        player_id = secrets.token_hex(4)
     player = Player(player_id, name)
     room.add_player(player)
     
     # Notify host
-    if room.host_ws:
-        await room.host_ws.send_json({
-            "type": "player_joined",
-            "player": {"id": player.id, "name": player.name},
-            **room.to_lobby_state()
-        })
+    await send_to_host(room, {
+        "type": "player_joined",
+        "player": {"id": player.id, "name": player.name},
+        **room.to_lobby_state()
+    })
     
     return {"player_id": player_id, "room_code": room_code}
 
@@ -1837,100 +2193,79 @@ async def room_exists(room_code: str):
 @app.get("/api/categories")
 async def get_categories():
     """Get available question categories"""
-    questions = load_questions()
-    return {
-        "categories": [
-            {"id": cat_id, "name": cat["name"], "count": len(cat["questions"])}
-            for cat_id, cat in questions["categories"].items()
-        ]
-    }
+    async with data_lock:
+        questions = await asyncio.to_thread(load_questions)
+        return {
+            "categories": [
+                {"id": cat_id, "name": cat["name"], "count": len(cat["questions"])}
+                for cat_id, cat in questions["categories"].items()
+            ]
+        }
 
 
 # ─────────────────────────── Admin Session Management ─────────────────────────── #
 
+def hosted_room(admin_username: str) -> GameRoom | None:
+    """The admin's live hosted room; a reference to a room since closed is dropped"""
+    room = admin_hosting_sessions.get(admin_username)
+    if room is None:
+        return None
+    if rooms.get(room.code) is room:
+        return room
+    # Room was cleaned up, remove stale reference
+    del admin_hosting_sessions[admin_username]
+    return None
+
+
 @app.get("/api/admin/session")
-async def get_admin_session(request: Request):
+async def get_admin_session(admin_username: str = Depends(require_admin)):
     """Get admin's current hosting session status"""
-    token = request.headers.get("X-Admin-Token")
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    admin_info = admin_sessions[token]
-    admin_username = admin_info.get("username") or admin_info.get("email", "admin")
-    
     # Check if admin has an active session
-    if admin_username in admin_hosting_sessions:
-        room_code = admin_hosting_sessions[admin_username]
-        if room_code in rooms:
-            room = rooms[room_code]
-            return {
-                "has_session": True,
-                "room_code": room_code,
-                "state": room.state,
-                "player_count": len(room.players),
-                "host_connected": room.host_connected,
-                "players": [{"id": p.id, "name": p.name, "score": p.score} for p in room.players.values()]
-            }
-        else:
-            # Room was cleaned up, remove stale reference
-            del admin_hosting_sessions[admin_username]
+    room = hosted_room(admin_username)
+    if room:
+        return {
+            "has_session": True,
+            "room_code": room.code,
+            "state": room.state,
+            "player_count": len(room.players),
+            "host_connected": room.host_connected,
+            "players": [{"id": p.id, "name": p.name, "score": p.score} for p in room.players.values()]
+        }
     
     return {"has_session": False}
 
 
 @app.post("/api/admin/session/close")
-async def close_admin_session(request: Request):
+async def close_admin_session(admin_username: str = Depends(require_admin)):
     """Close admin's current hosting session"""
-    token = request.headers.get("X-Admin-Token")
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    admin_info = admin_sessions[token]
-    admin_username = admin_info.get("username") or admin_info.get("email", "admin")
-    
-    if admin_username not in admin_hosting_sessions:
+    # Remove the session tracking
+    room = admin_hosting_sessions.pop(admin_username, None)
+    if room is None:
         return {"status": "no_session", "message": "No active session to close"}
     
-    room_code = admin_hosting_sessions[admin_username]
-    
-    if room_code in rooms:
-        room = rooms[room_code]
-        
+    if rooms.get(room.code) is room:
         # Notify all players that room is closing
-        for player in room.players.values():
-            if player.ws:
-                try:
-                    await player.ws.send_json({
-                        "type": "room_closed",
-                        "message": "The host has ended the session"
-                    })
-                    await player.ws.close()
-                except:
-                    pass
+        closed_msg = dumps({
+            "type": "room_closed",
+            "message": "The host has ended the session"
+        })
+        notify_and_close([p.ws for p in room.players.values() if p.ws], closed_msg)
         
         # Close host websocket if connected
         if room.host_ws:
-            try:
-                await room.host_ws.send_json({
-                    "type": "session_closed",
-                    "message": "Session closed from admin panel"
-                })
-                await room.host_ws.close()
-            except:
-                pass
+            notify_and_close([room.host_ws], dumps({
+                "type": "session_closed",
+                "message": "Session closed from admin panel"
+            }))
         
         # Delete the room
-        del rooms[room_code]
+        del rooms[room.code]
     
-    # Remove the session tracking
-    del admin_hosting_sessions[admin_username]
-    
-    return {"status": "closed", "message": f"Session {room_code} has been closed"}
+    return {"status": "closed", "message": f"Session {room.code} has been closed"}
 
 
-@app.get("/api/ip")
-async def get_ip():
-    """Get server IP for display"""
+def detect_server_ip() -> str:
+    """LAN address of this machine (blocking; the UDP connect sends no packets)"""
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
@@ -1938,17 +2273,50 @@ async def get_ip():
         s.close()
     except:
         ip = "127.0.0.1"
-    return {"ip": ip, "port": 8000}
+    return ip
+
+
+SERVER_IP_TTL = 5 * 60  # seconds before the address is looked up again (e.g. after a network change)
+server_ip: tuple[float, str] | None = None  # (looked up at, ip)
+
+
+@app.get("/api/ip")
+async def get_ip():
+    """Get server IP for display"""
+    global server_ip
+    if server_ip is None or time.time() - server_ip[0] > SERVER_IP_TTL:
+        server_ip = (time.time(), await asyncio.to_thread(detect_server_ip))
+    return {"ip": server_ip[1], "port": 8000}
 
 
 # ─────────────────────────── Admin Routes ─────────────────────────── #
 
-def get_admin_from_request(request: Request) -> str | None:
-    """Extract and verify admin token from request"""
-    token = request.headers.get("X-Admin-Token") or request.cookies.get("admin_token")
-    if token:
-        return verify_admin_token(token)
-    return None
+ADMIN_LOOKUP_TTL = 30  # seconds a Supabase admin lookup (or a miss) is reused
+admin_lookup_cache: dict[str, tuple[float, dict | None]] = {}  # username -> (fetched at, row or None)
+
+async def fetch_admin(username: str) -> dict | None:
+    """An admin's Supabase row, reusing a lookup from the last ADMIN_LOOKUP_TTL seconds"""
+    now = time.time()
+    cached = admin_lookup_cache.get(username)
+    if cached and now - cached[0] < ADMIN_LOOKUP_TTL:
+        return cached[1]
+    # The client is blocking, so run it off the event loop
+    result = await asyncio.to_thread(
+        supabase_client.table("admins").select("*").eq("username", username).execute
+    )
+    admin = result.data[0] if result.data else None
+    admin_lookup_cache[username] = (now, admin)
+    return admin
+
+
+def record_last_login(admin_id):
+    """Stamp an admin's last_login in Supabase (blocking)"""
+    try:
+        supabase_client.table("admins").update({
+            "last_login": datetime.now(timezone.utc).isoformat()
+        }).eq("id", admin_id).execute()
+    except Exception as e:
+        logger.error("Supabase last_login update error: %s", e)
 
 
 @app.post("/api/admin/login")
@@ -1957,29 +2325,30 @@ async def admin_login(request: Request):
     data = await request.json()
     username = data.get("username", data.get("email", "")).strip()
     password = data.get("password", "")
+    check_login_rate(request)
     
     # Try Supabase database first
     if supabase_client:
         try:
             # Query the admins table
-            result = supabase_client.table("admins").select("*").eq("username", username).execute()
+            admin = await fetch_admin(username)
             
-            if result.data and len(result.data) > 0:
-                admin = result.data[0]
+            if admin:
                 # Verify password
-                if verify_password(password, admin["password_hash"]):
+                async with hash_slots:
+                    valid = await asyncio.to_thread(verify_password, password, admin["password_hash"])
+                if valid:
                     # Generate session token
-                    token = str(uuid.uuid4())
+                    token = secrets.token_urlsafe(24)
                     admin_sessions[token] = {
                         "username": admin["username"],
                         "user_id": admin["id"],
-                        "name": admin.get("name", admin["username"])
+                        "name": admin.get("name", admin["username"]),
+                        "expires_at": time.time() + ADMIN_SESSION_TTL
                     }
                     
-                    # Update last_login timestamp
-                    supabase_client.table("admins").update({
-                        "last_login": datetime.utcnow().isoformat()
-                    }).eq("id", admin["id"]).execute()
+                    # Update last_login in the background; the token doesn't depend on it
+                    asyncio.create_task(asyncio.to_thread(record_last_login, admin["id"]))
                     
                     return {
                         "status": "success",
@@ -1993,17 +2362,19 @@ async def admin_login(request: Request):
         except HTTPException:
             raise
         except Exception as e:
-            print(f"Supabase login error: {e}")
+            logger.error("Supabase login error: %s", e)
             raise HTTPException(status_code=401, detail="Invalid username or password")
     
     # Fallback to local authentication (when Supabase not configured)
-    admins = load_admins()
+    async with data_lock:
+        admins = await asyncio.to_thread(load_admins)
     if username in admins["admins"]:
         if admins["admins"][username]["password"] == password:
-            token = str(uuid.uuid4())
+            token = secrets.token_urlsafe(24)
             admin_sessions[token] = {
                 "username": username,
-                "name": admins["admins"][username].get("name", username)
+                "name": admins["admins"][username].get("name", username),
+                "expires_at": time.time() + ADMIN_SESSION_TTL
             }
             return {
                 "status": "success",
@@ -2036,20 +2407,21 @@ async def admin_signup(request: Request):
     if supabase_client:
         try:
             # Check if username already exists
-            existing = supabase_client.table("admins").select("id").eq("username", username).execute()
-            if existing.data and len(existing.data) > 0:
+            if await fetch_admin(username):
                 raise HTTPException(status_code=400, detail="Username already taken")
             
             # Hash the password
-            password_hash = hash_password(password)
+            async with hash_slots:
+                password_hash = await asyncio.to_thread(hash_password, password)
             
             # Insert new admin into database
-            result = supabase_client.table("admins").insert({
+            result = await asyncio.to_thread(supabase_client.table("admins").insert({
                 "username": username,
                 "password_hash": password_hash,
                 "name": name
-            }).execute()
+            }).execute)
             
+            admin_lookup_cache.pop(username, None)  # its cached miss is now wrong
             if result.data:
                 return {
                     "status": "success",
@@ -2061,23 +2433,24 @@ async def admin_signup(request: Request):
         except HTTPException:
             raise
         except Exception as e:
-            print(f"Supabase signup error: {e}")
+            logger.error("Supabase signup error: %s", e)
             raise HTTPException(status_code=400, detail="Signup failed. Please try again.")
     
     # Fallback to local authentication (when Supabase not configured)
     try:
-        admins = load_admins()
-        
-        # Check if username already exists
-        if username in admins["admins"]:
-            raise HTTPException(status_code=400, detail="Username already taken")
-        
-        # Add new admin to local JSON (using plain text password for consistency with existing local auth)
-        admins["admins"][username] = {
-            "password": password,
-            "name": name
-        }
-        save_admins(admins)
+        async with data_lock:
+            admins = await asyncio.to_thread(load_admins)
+            
+            # Check if username already exists
+            if username in admins["admins"]:
+                raise HTTPException(status_code=400, detail="Username already taken")
+            
+            # Add new admin to local JSON (using plain text password for consistency with existing local auth)
+            admins["admins"][username] = {
+                "password": password,
+                "name": name
+            }
+            await asyncio.to_thread(save_admins, admins)
         
         return {
             "status": "success",
@@ -2086,7 +2459,7 @@ async def admin_signup(request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Local signup error: {e}")
+        logger.error("Local signup error: %s", e)
         raise HTTPException(status_code=400, detail="Signup failed. Please try again.")
 
 
@@ -2103,14 +2476,12 @@ async def admin_logout(request: Request):
 @app.get("/api/admin/me")
 async def admin_me(request: Request):
     """Get current admin info"""
-    token = request.headers.get("X-Admin-Token") or request.cookies.get("admin_token")
-    
-    if not token or token not in admin_sessions:
+    username = get_admin_from_request(request)
+    if not username:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    session = admin_sessions[token]
-    username = session.get("email") or session.get("username", "")
-    name = session.get("name", username)
+    token = request.headers.get("X-Admin-Token") or request.cookies.get("admin_token")
+    name = admin_sessions[token].get("name", username)
     
     return {
         "username": username,
@@ -2128,206 +2499,209 @@ async def admin_auth_mode():
 
 
 @app.get("/api/admin/questions")
-async def get_all_questions(request: Request):
+async def get_all_questions(username: str = Depends(require_admin)):
     """Get all questions for admin"""
-    username = get_admin_from_request(request)
-    if not username:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return load_questions()
+    async with data_lock:
+        questions = await asyncio.to_thread(load_questions)
+        # Encode the cached dict as is; returning it would have FastAPI copy
+        # the whole tree through jsonable_encoder before serializing it
+        return Response(orjson.dumps(questions), media_type="application/json")
 
 
 @app.post("/api/admin/questions")
-async def save_all_questions(request: Request):
+async def save_all_questions(request: Request, username: str = Depends(require_admin)):
     """Save all questions from admin"""
-    username = get_admin_from_request(request)
-    if not username:
-        raise HTTPException(status_code=401, detail="Not authenticated")
     data = await request.json()
-    save_questions(data)
-    return {"status": "saved"}
+    async with data_lock:
+        await asyncio.to_thread(save_questions, data)
+        return {"status": "saved"}
+
+
+# Runs of anything but letters, digits and "_" become one "_" in a category id
+CATEGORY_ID_JUNK = re.compile(r"\W+")
 
 
 @app.post("/api/admin/category")
-async def add_category(request: Request):
+async def add_category(request: Request, username: str = Depends(require_admin)):
     """Add a new category"""
-    username = get_admin_from_request(request)
-    if not username:
-        raise HTTPException(status_code=401, detail="Not authenticated")
     
     data = await request.json()
-    questions = load_questions()
+    async with data_lock:
+        questions = await asyncio.to_thread(load_questions)
     
-    cat_id = data.get("id", "").lower().replace(" ", "_")
-    cat_name = data.get("name", "")
+        cat_id = CATEGORY_ID_JUNK.sub("_", data.get("id", "").lower()).strip("_")
+        cat_name = data.get("name", "")
     
-    if not cat_id or not cat_name:
-        raise HTTPException(status_code=400, detail="ID and name required")
+        if not cat_id or not cat_name:
+            raise HTTPException(status_code=400, detail="ID and name required")
     
-    if cat_id in questions["categories"]:
-        raise HTTPException(status_code=400, detail="Category already exists")
+        if cat_id in questions["categories"]:
+            raise HTTPException(status_code=400, detail="Category already exists")
     
-    questions["categories"][cat_id] = {
-        "name": cat_name,
-        "questions": []
-    }
-    save_questions(questions)
-    return {"status": "created", "id": cat_id}
+        questions["categories"][cat_id] = {
+            "name": cat_name,
+            "questions": []
+        }
+        await asyncio.to_thread(save_questions, questions)
+        return {"status": "created", "id": cat_id}
 
 
 @app.post("/api/admin/question")
-async def add_question(request: Request):
+async def add_question(request: Request, username: str = Depends(require_admin)):
     """Add a question to a category"""
-    username = get_admin_from_request(request)
-    if not username:
-        raise HTTPException(status_code=401, detail="Not authenticated")
     
     data = await request.json()
-    questions = load_questions()
+    async with data_lock:
+        questions = await asyncio.to_thread(load_questions)
     
-    cat_id = data.get("category")
-    if cat_id not in questions["categories"]:
-        raise HTTPException(status_code=404, detail="Category not found")
+        cat_id = data.get("category")
+        if cat_id not in questions["categories"]:
+            raise HTTPException(status_code=404, detail="Category not found")
     
-    q_type = data.get("type", "choice")
+        q_type = data.get("type", "choice")
     
-    question = {
-        "id": f"q_{uuid.uuid4().hex[:8]}",
-        "type": q_type,
-        "question": data.get("question", ""),
-        "time_limit": data.get("time_limit", 15),
-        "created_by": username
-    }
+        question = {
+            "id": f"q_{secrets.token_hex(4)}",
+            "type": q_type,
+            "question": data.get("question", ""),
+            "time_limit": data.get("time_limit", 15),
+            "created_by": username
+        }
     
-    # Add type-specific fields
-    if q_type in ["choice", "poll", "wager"]:
-        question["answers"] = data.get("answers", ["", "", "", ""])
-        if q_type not in ["poll", "open_poll"]:
+        # Add type-specific fields
+        if q_type in ["choice", "poll", "wager"]:
+            question["answers"] = data.get("answers", ["", "", "", ""])
+            if q_type not in ["poll", "open_poll"]:
+                question["correct"] = data.get("correct", 0)
+        elif q_type == "open_poll":
+            # open_poll doesn't need answers or correct - players enter their own
+            pass
+        elif q_type == "truefalse":
+            question["correct"] = data.get("correct", True)
+        elif q_type == "number":
             question["correct"] = data.get("correct", 0)
-    elif q_type == "open_poll":
-        # open_poll doesn't need answers or correct - players enter their own
-        pass
-    elif q_type == "truefalse":
-        question["correct"] = data.get("correct", True)
-    elif q_type == "number":
-        question["correct"] = data.get("correct", 0)
-        question["tolerance"] = data.get("tolerance", 0)
-    elif q_type == "text":
-        # correct can be string or list of acceptable answers
-        correct = data.get("correct", "")
-        question["correct"] = correct if isinstance(correct, list) else [correct]
+            question["tolerance"] = data.get("tolerance", 0)
+        elif q_type == "text":
+            # correct can be string or list of acceptable answers
+            correct = data.get("correct", "")
+            question["correct"] = correct if isinstance(correct, list) else [correct]
     
-    questions["categories"][cat_id]["questions"].append(question)
-    save_questions(questions)
-    return {"status": "created", "question": question}
+        cat_questions = questions["categories"][cat_id]["questions"]
+        cat_questions.append(question)
+        index_questions(questions)[question["id"]] = (cat_id, len(cat_questions) - 1)
+        await asyncio.to_thread(save_questions, questions)
+        return {"status": "created", "question": question}
 
 
 @app.put("/api/admin/question/{question_id}")
-async def update_question(question_id: str, request: Request):
+async def update_question(question_id: str, request: Request, username: str = Depends(require_admin)):
     """Update a question"""
-    username = get_admin_from_request(request)
-    if not username:
-        raise HTTPException(status_code=401, detail="Not authenticated")
     
     data = await request.json()
-    questions = load_questions()
-    
-    for cat in questions["categories"].values():
-        for i, q in enumerate(cat["questions"]):
-            if q["id"] == question_id:
-                q_type = data.get("type", q.get("type", "choice"))
-                
-                updated = {
-                    "id": question_id,
-                    "type": q_type,
-                    "question": data.get("question", q.get("question", "")),
-                    "time_limit": data.get("time_limit", q.get("time_limit", 15)),
-                    "created_by": q.get("created_by", username)
-                }
-                
-                # Add type-specific fields
-                if q_type in ["choice", "poll", "wager"]:
-                    updated["answers"] = data.get("answers", q.get("answers", []))
-                    if q_type not in ["poll", "open_poll"]:
-                        updated["correct"] = data.get("correct", q.get("correct", 0))
-                elif q_type == "open_poll":
-                    # open_poll doesn't need answers or correct - players enter their own
-                    pass
-                elif q_type == "truefalse":
-                    updated["correct"] = data.get("correct", q.get("correct", True))
-                elif q_type == "number":
-                    updated["correct"] = data.get("correct", q.get("correct", 0))
-                    updated["tolerance"] = data.get("tolerance", q.get("tolerance", 0))
-                elif q_type == "text":
-                    correct = data.get("correct", q.get("correct", []))
-                    updated["correct"] = correct if isinstance(correct, list) else [correct]
-                
-                cat["questions"][i] = updated
-                save_questions(questions)
-                return {"status": "updated"}
+    async with data_lock:
+        questions = await asyncio.to_thread(load_questions)
+    
+        found = find_question(questions, question_id)
+        if not found:
+            raise HTTPException(status_code=404, detail="Question not found")
+        cat, i = found
+        q = cat["questions"][i]
+        q_type = data.get("type", q.get("type", "choice"))
+    
+        updated = {
+            "id": question_id,
+            "type": q_type,
+            "question": data.get("question", q.get("question", "")),
+            "time_limit": data.get("time_limit", q.get("time_limit", 15)),
+            "created_by": q.get("created_by", username)
+        }
     
-    raise HTTPException(status_code=404, detail="Question not found")
+        # Add type-specific fields
+        if q_type in ["choice", "poll", "wager"]:
+            updated["answers"] = data.get("answers", q.get("answers", []))
+            if q_type not in ["poll", "open_poll"]:
+                updated["correct"] = data.get("correct", q.get("correct", 0))
+        elif q_type == "open_poll":
+            # open_poll doesn't need answers or correct - players enter their own
+            pass
+        elif q_type == "truefalse":
+            updated["correct"] = data.get("correct", q.get("correct", True))
+        elif q_type == "number":
+            updated["correct"] = data.get("correct", q.get("correct", 0))
+            updated["tolerance"] = data.get("tolerance", q.get("tolerance", 0))
+        elif q_type == "text":
+            correct = data.get("correct", q.get("correct", []))
+            updated["correct"] = correct if isinstance(correct, list) else [correct]
+    
+        cat["questions"][i] = updated
+        await asyncio.to_thread(save_questions, questions)
+        return {"status": "updated"}
 
 
 @app.delete("/api/admin/question/{question_id}")
-async def delete_question(question_id: str, request: Request):
+async def delete_question(question_id: str, username: str = Depends(require_admin)):
     """Delete a question"""
-    username = get_admin_from_request(request)
-    if not username:
-        raise HTTPException(status_code=401, detail="Not authenticated")
     
-    questions = load_questions()
+    async with data_lock:
+        questions = await asyncio.to_thread(load_questions)
     
-    for cat in questions["categories"].values():
-        for i, q in enumerate(cat["questions"]):
-            if q["id"] == question_id:
-                del cat["questions"][i]
-                save_questions(questions)
-                return {"status": "deleted"}
+        found = find_question(questions, question_id)
+        if not found:
+            raise HTTPException(status_code=404, detail="Question not found")
+        cat, i = found
     
-    raise HTTPException(status_code=404, detail="Question not found")
+        # Only the questions after it in the same category move; entries that
+        # don't point at them (e.g. duplicate ids) are left for find_question
+        # to notice and rebuild
+        index = index_questions(questions)
+        cat_id = index.pop(question_id)[0]
+        for pos, q in enumerate(cat["questions"][i + 1:], i + 1):
+            if index.get(q["id"]) == (cat_id, pos):
+                index[q["id"]] = (cat_id, pos - 1)
+        del cat["questions"][i]
+        await asyncio.to_thread(save_questions, questions)
+        return {"status": "deleted"}
 
 
 # ─────────────────────────── Team Management Routes ─────────────────────────── #
 
-@app.post("/api/room/{room_code}/team-mode")
+@app.post("/api/room/{room_code}/team-mode", dependencies=[Depends(require_admin)])
 async def toggle_team_mode(room_code: str, request: Request):
     """Enable/disable team mode for a room"""
     room_code = room_code.upper()
-    token = request.headers.get("X-Admin-Token")
-    
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required")
     
     if room_code not in rooms:
         raise HTTPException(status_code=404, detail="Room not found")
     
     room = rooms[room_code]
     data = await request.json()
-    room.team_mode = data.get("enabled", False)
+    enabled = bool(data.get("enabled", False))
+    
+    # Nothing to change (or clear): skip the broadcast to every player
+    if enabled == room.team_mode and (enabled or not any(p.team_id for p in room.players.values())):
+        return {"team_mode": room.team_mode}
+    room.team_mode = enabled
     
     # If disabling, clear team assignments but keep teams
     if not room.team_mode:
         for player in room.players.values():
             player.team_id = None
+        room.roster_changed()
     
     # Notify all clients
     await broadcast_to_room(room, {
         "type": "team_mode_changed",
         "team_mode": room.team_mode,
-        "teams": {tid: t.to_dict() for tid, t in room.teams.items()}
+        "teams": room.lobby_roster()[1]
     })
     
     return {"team_mode": room.team_mode}
 
 
-@app.post("/api/room/{room_code}/teams")
+@app.post("/api/room/{room_code}/teams", dependencies=[Depends(require_admin)])
 async def create_team(room_code: str, request: Request):
     """Create a new team in the room"""
     room_code = room_code.upper()
-    token = request.headers.get("X-Admin-Token")
-    
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required")
     
     if room_code not in rooms:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -2347,22 +2721,18 @@ async def create_team(room_code: str, request: Request):
     # Notify all clients
     await broadcast_to_room(room, {
         "type": "team_created",
-        "team": team.to_dict(),
-        "teams": {tid: t.to_dict() for tid, t in room.teams.items()},
+        "team": room.team_info(team.id),
+        "teams": room.lobby_roster()[1],
         "team_mode": room.team_mode
     })
     
     return {"team": team.to_dict()}
 
 
-@app.delete("/api/room/{room_code}/teams/{team_id}")
+@app.delete("/api/room/{room_code}/teams/{team_id}", dependencies=[Depends(require_admin)])
 async def delete_team(room_code: str, team_id: str, request: Request):
     """Delete a team"""
     room_code = room_code.upper()
-    token = request.headers.get("X-Admin-Token")
-    
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required")
     
     if room_code not in rooms:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -2380,22 +2750,18 @@ async def delete_team(room_code: str, team_id: str, request: Request):
     await broadcast_to_room(room, {
         "type": "team_deleted",
         "team_id": team_id,
-        "teams": {tid: t.to_dict() for tid, t in room.teams.items()},
+        "teams": room.lobby_roster()[1],
         "team_mode": room.team_mode,
-        "players": [{"id": p.id, "name": p.name, "team_id": p.team_id} for p in room.players.values()]
+        "players": room.lobby_roster()[0]
     })
     
     return {"status": "deleted"}
 
 
-@app.put("/api/room/{room_code}/teams/{team_id}")
+@app.put("/api/room/{room_code}/teams/{team_id}", dependencies=[Depends(require_admin)])
 async def update_team(room_code: str, team_id: str, request: Request):
     """Update team name/color"""
     room_code = room_code.upper()
-    token = request.headers.get("X-Admin-Token")
-    
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required")
     
     if room_code not in rooms:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -2408,29 +2774,28 @@ async def update_team(room_code: str, team_id: str, request: Request):
     data = await request.json()
     team = room.teams[team_id]
     
-    if "name" in data:
-        team.name = data["name"]
-    if "color" in data:
-        team.color = data["color"]
+    name = data.get("name", team.name)
+    color = data.get("color", team.color)
+    if name == team.name and color == team.color:
+        return {"team": team.to_dict()}  # No-op edit, nothing to broadcast
+    team.name = name
+    team.color = color
+    room.roster_changed()
     
     # Notify all clients
     await broadcast_to_room(room, {
         "type": "team_updated",
-        "team": team.to_dict(),
-        "teams": {tid: t.to_dict() for tid, t in room.teams.items()}
+        "team": room.team_info(team.id),
+        "teams": room.lobby_roster()[1]
     })
     
     return {"team": team.to_dict()}
 
 
-@app.post("/api/room/{room_code}/teams/assign")
+@app.post("/api/room/{room_code}/teams/assign", dependencies=[Depends(require_admin)])
 async def assign_player_to_team(room_code: str, request: Request):
     """Assign a player to a team"""
     room_code = room_code.upper()
-    token = request.headers.get("X-Admin-Token")
-    
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required")
     
     if room_code not in rooms:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -2452,14 +2817,12 @@ async def assign_player_to_team(room_code: str, request: Request):
         "player_id": player_id,
         "player_name": player.name,
         "team_id": team_id,
-        "players": [{"id": p.id, "name": p.name, "team_id": p.team_id} for p in room.players.values()]
+        "players": room.lobby_roster()[0]
     })
     
     # Notify the specific player
     if player.ws:
-        team_info = None
-        if team_id and team_id in room.teams:
-            team_info = room.teams[team_id].to_dict()
+        team_info = room.team_info(team_id)
         await send_to_player(player, {
             "type": "your_team_changed",
             "team_id": team_id,
@@ -2469,14 +2832,10 @@ async def assign_player_to_team(room_code: str, request: Request):
     return {"status": "assigned", "player_id": player_id, "team_id": team_id}
 
 
-@app.post("/api/room/{room_code}/teams/auto-assign")
+@app.post("/api/room/{room_code}/teams/auto-assign", dependencies=[Depends(require_admin)])
 async def auto_assign_teams(room_code: str, request: Request):
     """Automatically distribute players across teams"""
     room_code = room_code.upper()
-    token = request.headers.get("X-Admin-Token")
-    
-    if not token or token not in admin_sessions:
-        raise HTTPException(status_code=401, detail="Admin authentication required")
     
     if room_code not in rooms:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -2492,24 +2851,26 @@ async def auto_assign_teams(room_code: str, request: Request):
     await broadcast_to_room(room, {
         "type": "teams_auto_assigned",
         "team_mode": True,
-        "teams": {tid: t.to_dict() for tid, t in room.teams.items()},
-        "players": [{"id": p.id, "name": p.name, "team_id": p.team_id} for p in room.players.values()]
+        "teams": room.lobby_roster()[1],
+        "players": room.lobby_roster()[0]
     })
     
-    # Notify each player of their team
-    for player in room.players.values():
+    # Notify each player of their team (one payload per team, not per player)
+    team_msgs = {}
+    for player in list(room.players.values()):  # snapshot, the loop awaits
         if player.ws and player.team_id:
-            team_info = room.teams[player.team_id].to_dict()
-            await send_to_player(player, {
-                "type": "your_team_changed",
-                "team_id": player.team_id,
-                "team": team_info
-            })
+            if player.team_id not in team_msgs:
+                team_msgs[player.team_id] = dumps({
+                    "type": "your_team_changed",
+                    "team_id": player.team_id,
+                    "team": room.team_info(player.team_id)
+                })
+            await send_to_player(player, team_msgs[player.team_id])
     
     return {
         "status": "assigned",
-        "teams": {tid: t.to_dict() for tid, t in room.teams.items()},
-        "players": [{"id": p.id, "name": p.name, "team_id": p.team_id} for p in room.players.values()]
+        "teams": room.lobby_roster()[1],
+        "players": room.lobby_roster()[0]
     }
 
 
@@ -2533,4 +2894,11 @@ if __name__ == "__main__":
     print("📺 Host display: http://localhost:8000/host.html")
     print("⚙️  Admin panel: http://localhost:8000/admin.html")
     print("ℹ️  Launch page: Hosted on GitHub Pages\n")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop (libuv) schedules socket I/O and tasks faster than the stock loop
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"  # e.g. Windows, where uvloop isn't available
+    print(f"⚡ Event loop: {loop}")
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop)